@@ -0,0 +1,149 @@
+"""
+Frame-budgeted animation engine
+All animations are advanced by a single fixed-rate tick per Tk root. Progress
+is time based, so frames that arrive late are simply skipped, and each tick
+stops after a small time budget so keystrokes never wait long behind it.
+"""
+
+import time
+
+from metrics import get_metrics
+
+DEFAULT_FPS = 30
+DEFAULT_BUDGET = 0.008  # seconds of animation work per tick
+
+
+def ease_out(t):
+    """Quadratic ease-out"""
+    return 1 - (1 - t) * (1 - t)
+
+
+def linear(t):
+    return t
+
+
+def blend(color_a, color_b, t):
+    """Blend two #RRGGBB colors"""
+    a = int(color_a[1:], 16)
+    b = int(color_b[1:], 16)
+    channels = []
+    for shift in (16, 8, 0):
+        start = (a >> shift) & 0xFF
+        end = (b >> shift) & 0xFF
+        channels.append(round(start + (end - start) * t))
+    return "#%02x%02x%02x" % tuple(channels)
+
+
+class Animation:
+    """A single animation; step(progress) is called with progress in 0..1"""
+
+    def __init__(self, duration, step, on_done=None, easing=ease_out):
+        self.duration = duration
+        self.step = step
+        self.on_done = on_done
+        self.easing = easing
+        self.started_at = None
+
+
+class Animator:
+    """Drives every running animation from one fixed-rate tick"""
+
+    def __init__(self, widget, fps=DEFAULT_FPS, budget=DEFAULT_BUDGET):
+        self.widget = widget
+        self.period = 1.0 / fps
+        self.budget = budget
+        self._animations = {}  # (owner id, name) -> Animation
+        self._after_id = None
+        self._last_tick = None
+
+        metrics = get_metrics()
+        self.frame_metric = metrics.histogram("animation_frame_seconds", "Time spent in one animation tick")
+        self.skipped_metric = metrics.counter("animation_frames_skipped_total", "Animation frames dropped under load")
+
+    def start(self, owner, name, animation):
+        """Start an animation, replacing any running one with the same owner and name"""
+        animation.started_at = time.perf_counter()
+        animation.step(animation.easing(0.0))
+        self._animations[(id(owner), name)] = animation
+        if self._after_id is None:
+            self._last_tick = animation.started_at
+            self._after_id = self.widget.after(int(self.period * 1000), self._tick)
+
+    def cancel(self, owner, name):
+        """Stop an animation without finishing it"""
+        self._animations.pop((id(owner), name), None)
+
+    def cancel_all(self, owner):
+        """Stop all animations of an owner (e.g. before it is destroyed)"""
+        for key in [key for key in self._animations if key[0] == id(owner)]:
+            del self._animations[key]
+
+    def finish(self):
+        """Jump every animation to its final frame and cancel the tick"""
+        while self._animations:
+            _, animation = self._animations.popitem()
+            animation.step(1.0)
+            if animation.on_done:
+                animation.on_done()  # may start another animation, finished in turn
+        self.stop()
+
+    def stop(self):
+        """Cancel the tick and every animation"""
+        self._animations.clear()
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        frame_start = time.perf_counter()
+
+        # Frames that should have happened while we were late are skipped
+        late_frames = int((frame_start - self._last_tick) / self.period) - 1
+        if late_frames > 0:
+            self.skipped_metric.inc(late_frames)
+        self._last_tick = frame_start
+
+        items = list(self._animations.items())
+        for index, (key, animation) in enumerate(items):
+            if time.perf_counter() - frame_start > self.budget:
+                # Out of budget: the rest run first on the next tick
+                self.skipped_metric.inc()
+                reordered = {
+                    deferred_key: deferred for deferred_key, deferred in items[index:]
+                    if self._animations.get(deferred_key) is deferred
+                }
+                reordered.update(self._animations)
+                self._animations = reordered
+                break
+
+            progress = min((frame_start - animation.started_at) / animation.duration, 1.0)
+            animation.step(animation.easing(progress))
+            if progress >= 1.0 and self._animations.get(key) is animation:
+                del self._animations[key]
+                if animation.on_done:
+                    animation.on_done()
+
+        elapsed = time.perf_counter() - frame_start
+        self.frame_metric.observe(elapsed)
+
+        if self._animations:
+            delay = max(self.period - elapsed, 0.001)
+            self._after_id = self.widget.after(int(delay * 1000), self._tick)
+
+
+def get_animator(widget):
+    """Get the animator shared by all widgets of a Tk root"""
+    root = widget._root()
+    animator = getattr(root, "_animator", None)
+    if animator is None:
+        animator = root._animator = Animator(root)
+    return animator
+
+
+def pulse(widget, option, base, peak, duration=0.5):
+    """Animation that blends a color option to peak and back to base"""
+    def step(t):
+        widget.config(**{option: blend(base, peak, 1 - abs(2 * t - 1))})
+
+    return Animation(duration, step, easing=linear)
@@ -3,23 +3,53 @@
 Math Learning Tool - Interactive number decomposition trainer for children
 """
 
+import argparse
+import json
 import tkinter as tk
-from tkinter import font as tkfont
 import sys
 import os
+import time
 
 # Add the project directory to the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from levels.level1 import Level1
-from levels.level2 import Level2
-from levels.level3 import Level3
+from animation import get_animator
+from audio_manager import get_audio_manager
+from dashboard import open_dashboard
+from dot_sprites import BACKENDS, DEFAULT_BACKEND, set_dot_backend
+from levels.compiler import compile_exercises
+from levels.logic import NUMBERS
+from levels.registry import get_level_registry
+from metrics import EventLoopLagMonitor, TextfileExporter, get_metrics
+from power import DEFAULT_IDLE_TIMEOUT, IdleManager
+from progress import ProgressFileError, export_progress, import_progress
+from progress_sync import ProgressSync
+from records import add_answer_listener
+from session import start_recording, stop_recording
+from stall_watchdog import DEFAULT_LOG_FILE, StallWatchdog
+from styles import get_font, get_font_registry
+from ui_state import StateStore
+
+# Button styles for the sidebar selectors
+LEVEL_SELECTED_STYLE = {"bg": "#4CAF50", "fg": "white", "relief": "sunken"}
+NUMBER_SELECTED_STYLE = {"bg": "#2196F3", "fg": "white", "relief": "sunken"}
+UNSELECTED_STYLE = {"bg": "#D3D3D3", "fg": "black", "relief": "raised"}
+
+
+def count_answer(answer):
+    """Count a checked answer (registered once, shared by all seats)"""
+    get_metrics().counter("answers_total", "Answers checked", ("level", "result")).inc(
+        level=answer.level, result="correct" if answer.correct else "wrong"
+    )
 
 
 class MathLearningApp:
-    def __init__(self, root):
+    def __init__(self, root, seat=None):
         self.root = root
-        self.root.title("Math Learning Tool")
+        self.seat = seat
+        # Levels look up their seat's session recorder through their toplevel
+        self.root.seat = seat
+        self.root.title("Math Learning Tool" if seat is None else f"Math Learning Tool - Seat {seat}")
         self.root.geometry("900x600")
         self.root.configure(bg="#F0F0F0")
 
@@ -31,6 +61,19 @@ class MathLearningApp:
         self.current_level = 1
         self.current_number = 5
         self.current_level_widget = None
+        self.level_registry = get_level_registry()
+
+        # Metrics
+        metrics = get_metrics()
+        self.errors_metric = metrics.counter("errors_total", "Unhandled exceptions in Tk callbacks")
+        self.switches_metric = metrics.counter("selection_switches_total", "Level and number switches", ("kind",))
+        self.level_load_metric = metrics.histogram("level_load_seconds", "Time to build a level widget", ("level",))
+        add_answer_listener(count_answer)
+        if isinstance(self.root, tk.Tk):
+            self.root.report_callback_exception = self.report_callback_exception
+        self.ui_state = StateStore(
+            self.root, level=self.current_level, number=self.current_number
+        )
 
         # Create UI components
         self.create_sidebar()
@@ -50,22 +93,26 @@ class MathLearningApp:
             sidebar,
             text="Level",
             bg="#E0E0E0",
-            font=("Arial", 14, "bold")
+            font=get_font(self.root, "heading")
         )
         level_label.pack(pady=(0, 10))
 
         self.level_buttons = {}
-        for level in range(1, 4):
+        for level in self.level_registry.ids():
             btn = tk.Button(
                 sidebar,
                 text=str(level),
                 width=8,
                 height=2,
-                font=("Arial", 12),
+                font=get_font(self.root, "button"),
                 command=lambda l=level: self.select_level(l)
             )
             btn.pack(pady=5)
             self.level_buttons[level] = btn
+            self.ui_state.bind(
+                btn, "level",
+                lambda value, l=level: LEVEL_SELECTED_STYLE if value == l else UNSELECTED_STYLE
+            )
 
         # Separator
         separator = tk.Frame(sidebar, bg="#A0A0A0", height=2)
@@ -76,25 +123,26 @@ class MathLearningApp:
             sidebar,
             text="Number",
             bg="#E0E0E0",
-            font=("Arial", 14, "bold")
+            font=get_font(self.root, "heading")
         )
         number_label.pack(pady=(0, 10))
 
         self.number_buttons = {}
-        for num in range(4, 11):
+        for num in NUMBERS:
             btn = tk.Button(
                 sidebar,
                 text=str(num),
                 width=8,
                 height=1,
-                font=("Arial", 11),
+                font=get_font(self.root, "button_small"),
                 command=lambda n=num: self.select_number(n)
             )
             btn.pack(pady=3)
             self.number_buttons[num] = btn
-
-        # Highlight initial selections
-        self.update_button_highlights()
+            self.ui_state.bind(
+                btn, "number",
+                lambda value, n=num: NUMBER_SELECTED_STYLE if value == n else UNSELECTED_STYLE
+            )
 
     def create_main_panel(self):
         """Create main panel for level display"""
@@ -107,6 +155,7 @@ class MathLearningApp:
         """Handle level selection"""
         if self.current_level != level:
             self.current_level = level
+            self.switches_metric.inc(kind="level")
             self.update_button_highlights()
             self.load_level(level)
 
@@ -114,25 +163,18 @@ class MathLearningApp:
         """Handle number selection"""
         if self.current_number != number:
             self.current_number = number
+            self.switches_metric.inc(kind="number")
             self.update_button_highlights()
+            audio = get_audio_manager()
+            if audio.number_prompts:
+                audio.play_number(number, self.current_level)
             if self.current_level_widget:
                 self.current_level_widget.set_number(number)
 
     def update_button_highlights(self):
         """Update button colors to show current selection"""
-        # Update level buttons
-        for level, btn in self.level_buttons.items():
-            if level == self.current_level:
-                btn.config(bg="#4CAF50", fg="white", relief="sunken")
-            else:
-                btn.config(bg="#D3D3D3", fg="black", relief="raised")
-
-        # Update number buttons
-        for num, btn in self.number_buttons.items():
-            if num == self.current_number:
-                btn.config(bg="#2196F3", fg="white", relief="sunken")
-            else:
-                btn.config(bg="#D3D3D3", fg="black", relief="raised")
+        # Only the buttons whose selection state changed are reconfigured
+        self.ui_state.set(level=self.current_level, number=self.current_number)
 
     def load_level(self, level):
         """Load the specified level into the main panel"""
@@ -140,23 +182,314 @@ class MathLearningApp:
         if self.current_level_widget:
             self.current_level_widget.destroy()
 
-        # Create new level widget
-        if level == 1:
-            self.current_level_widget = Level1(self.main_panel, self.current_number)
-        elif level == 2:
-            self.current_level_widget = Level2(self.main_panel, self.current_number)
-        elif level == 3:
-            self.current_level_widget = Level3(self.main_panel, self.current_number)
+        self.current_level_widget = None
+
+        # Create new level widget (the level module is imported on first use)
+        try:
+            level_class = self.level_registry.get(level)
+        except (ImportError, AttributeError) as e:
+            print(f"Warning: Could not load level {level}: {e}")
+            return
+        start = time.perf_counter()
+        self.current_level_widget = level_class(self.main_panel, self.current_number)
 
         if self.current_level_widget:
             self.current_level_widget.pack(fill="both", expand=True)
+            # Batch exercises may switch the level to another number
+            level_state = getattr(self.current_level_widget, "ui_state", None)
+            if level_state is not None:
+                level_state.subscribe("number", self.on_level_number)
+        self.level_load_metric.observe(time.perf_counter() - start, level=level)
+
+    def on_level_number(self, number):
+        """Highlight a number the level switched to by itself"""
+        if self.current_number != number:
+            self.current_number = number
+            self.update_button_highlights()
+
+    def load_exercises(self, batch):
+        """Switch to the batch's level and practice its exercises (see levels.compiler)"""
+        self.select_level(batch.level)
+        if self.current_level_widget:
+            self.current_level_widget.load_exercises(batch)
+
+    def close(self):
+        """Destroy this app's window, cancelling pending callbacks first"""
+        if self.current_level_widget:
+            self.current_level_widget.destroy()
+            self.current_level_widget = None
+        self.ui_state.cancel()
+        self.root.destroy()
+
+    def report_callback_exception(self, exc, value, traceback):
+        """Count exceptions raised in Tk callbacks, then report them as usual"""
+        self.errors_metric.inc()
+        tk.Tk.report_callback_exception(self.root, exc, value, traceback)
+
+
+def open_seats(root, count, screens=()):
+    """Open student seats as Toplevel windows of one hidden root
+
+    The seats share the process' AudioManager, sound bank, decomposition index
+    and animator; each has its own level and number. A seat may be placed on
+    another screen or display (e.g. ":1"); only seats on separate X displays
+    get separate keyboards, as a display has a single input focus. The root
+    is destroyed once the last seat is closed.
+    """
+    root.withdraw()
+    seats = []
+
+    def close_seat(app):
+        app.close()
+        seats.remove(app)
+        if not seats:
+            root.destroy()
+
+    for index in range(max(count, len(screens))):
+        options = {"screen": screens[index]} if index < len(screens) else {}
+        window = tk.Toplevel(root, **options)
+        app = MathLearningApp(window, seat=index + 1)
+        window.protocol("WM_DELETE_WINDOW", lambda app=app: close_seat(app))
+        seats.append(app)
+    root.report_callback_exception = seats[0].report_callback_exception
+    return seats
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Math Learning Tool")
+    parser.add_argument(
+        "--metrics-file",
+        help="periodically write Prometheus metrics to this file (e.g. for node_exporter's textfile collector)"
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=15.0,
+        help="seconds between metrics exports (default: 15)"
+    )
+    parser.add_argument(
+        "--watchdog",
+        action="store_true",
+        help="log the main thread's stack whenever the event loop stalls"
+    )
+    parser.add_argument(
+        "--watchdog-threshold",
+        type=float,
+        default=250,
+        help="stall threshold in milliseconds (default: 250)"
+    )
+    parser.add_argument(
+        "--watchdog-log",
+        default=DEFAULT_LOG_FILE,
+        help="rotating log file for stall reports (default: stalls.log)"
+    )
+    parser.add_argument(
+        "--record-sessions",
+        metavar="DIR",
+        help="record seeds and keystrokes of this session into DIR for replay.py"
+    )
+    parser.add_argument(
+        "--exercises",
+        metavar="FILE",
+        help="practice a batch of exercises compiled from a JSON spec (see levels/compiler.py)"
+    )
+    parser.add_argument(
+        "--student",
+        default="",
+        help="name of the student, stored in progress exports"
+    )
+    parser.add_argument(
+        "--import-progress",
+        metavar="FILE",
+        help="load a progress export (answer history) at startup"
+    )
+    parser.add_argument(
+        "--export-progress",
+        metavar="FILE",
+        help="write the answer history to FILE on exit"
+    )
+    parser.add_argument(
+        "--sync-folder",
+        metavar="DIR",
+        help="replicate progress with other devices through this shared folder"
+    )
+    parser.add_argument(
+        "--device",
+        help="name of this device in the sync folder (default: host name)"
+    )
+    parser.add_argument(
+        "--sync-interval",
+        type=float,
+        default=30.0,
+        help="seconds between progress syncs (default: 30)"
+    )
+    parser.add_argument(
+        "--dashboard",
+        action="store_true",
+        help="also open the teacher dashboard for the students in --sync-folder"
+    )
+    parser.add_argument(
+        "--font-scale",
+        type=float,
+        default=1.0,
+        help="scale all text, e.g. 1.5 for large displays (default: 1.0)"
+    )
+    parser.add_argument(
+        "--dot-backend",
+        choices=sorted(BACKENDS),
+        default=DEFAULT_BACKEND,
+        help="draw dots as vector ovals or as pre-rendered sprites (default: oval)"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        metavar="SECONDS",
+        help="pause timers, audio and animations after this long without input; 0 disables (default: 300)"
+    )
+    parser.add_argument(
+        "--sound-theme",
+        metavar="THEME",
+        help="sound theme from sounds/manifest.json or the sound library, e.g. soft"
+    )
+    parser.add_argument(
+        "--number-prompts",
+        action="store_true",
+        help="play the selected number's chord from the sound library"
+    )
+    parser.add_argument(
+        "--seats",
+        type=int,
+        default=1,
+        help="number of student seats (windows) to run in this process (default: 1)"
+    )
+    parser.add_argument(
+        "--seat-screen",
+        action="append",
+        default=[],
+        metavar="SCREEN",
+        help="open the next seat on this X display, e.g. :1 (repeat once per seat)"
+    )
+    args = parser.parse_args(argv)
+    if args.import_progress and args.sync_folder:
+        # The sync checkpoint already holds everything merged before, so the
+        # imported answers would be counted again on every start
+        parser.error("--import-progress cannot be combined with --sync-folder")
+    return args
 
 
 def main():
+    args = parse_args()
+    seats = max(args.seats, len(args.seat_screen))
+    if args.record_sessions:
+        if seats > 1:
+            # One session file per seat, so each replays on its own
+            for seat in range(1, seats + 1):
+                start_recording(args.record_sessions, seat=seat)
+        else:
+            start_recording(args.record_sessions)
+
+    if args.import_progress:
+        try:
+            student, count = import_progress(args.import_progress)
+            print(f"Imported {count} answers of {student or 'unnamed student'}")
+        except (OSError, ProgressFileError) as e:
+            print(f"Warning: Could not import progress: {e}")
+
     root = tk.Tk()
-    app = MathLearningApp(root)
+    audio = get_audio_manager()
+    audio.number_prompts = args.number_prompts
+    if args.sound_theme:
+        if args.sound_theme in audio.themes():
+            audio.set_theme(args.sound_theme)
+        else:
+            print(f"Warning: Unknown sound theme {args.sound_theme!r}, available: {', '.join(audio.themes())}")
+    set_dot_backend(args.dot_backend)
+    if args.font_scale != 1.0:
+        get_font_registry(root).rescale(args.font_scale)
+
+    sync = None
+    if args.sync_folder:
+        sync = ProgressSync(args.sync_folder, device=args.device, student=args.student,
+                            interval=args.sync_interval)
+        try:
+            sync.start(root)
+        except OSError as e:
+            print(f"Warning: Could not open sync folder: {e}")
+            sync = None
+
+    if seats > 1:
+        apps = open_seats(root, seats, args.seat_screen)
+    else:
+        apps = [MathLearningApp(root)]
+
+    if args.exercises:
+        try:
+            with open(args.exercises, encoding="utf-8") as spec_file:
+                batch = compile_exercises(json.load(spec_file))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Warning: Could not load exercises: {e}")
+        else:
+            for app in apps:
+                app.load_exercises(batch)
+
+    dashboard = None
+    if args.dashboard:
+        if args.sync_folder:
+            dashboard = open_dashboard(root, args.sync_folder)
+        else:
+            print("Warning: The dashboard needs --sync-folder")
+
+    exporter = None
+    if args.metrics_file:
+        exporter = TextfileExporter(get_metrics(), args.metrics_file, args.metrics_interval)
+        exporter.start(root)
+        lag_monitor = EventLoopLagMonitor(get_metrics())
+        lag_monitor.start(root)
+
+    watchdog = None
+    if args.watchdog:
+        watchdog = StallWatchdog(root, threshold=args.watchdog_threshold / 1000, log_path=args.watchdog_log)
+        watchdog.start()
+
+    if args.idle_timeout > 0:
+        # Everything that wakes the event loop periodically is paused while idle
+        idle = IdleManager(root, args.idle_timeout)
+        idle.add(get_animator(root).finish)
+        if watchdog:
+            idle.add(watchdog.pause, watchdog.start)
+        if exporter:
+            idle.add(lag_monitor.stop, lambda: lag_monitor.start(root))
+            # stop() writes a snapshot, so the exported metrics show the app went idle
+            idle.add(exporter.stop, lambda: exporter.start(root))
+        if sync:
+            idle.add(sync.pause, sync.resume)
+        if dashboard:
+            idle.add(dashboard.pause, dashboard.resume)
+        # Reopening the audio device is slow; do it once the key handler has returned
+        # (a timer, as resume() flushes after_idle callbacks to restore the UI)
+        idle.add(audio.suspend, lambda: root.after(0, audio.resume))
+        idle.start()
+
     root.mainloop()
 
+    if watchdog:
+        watchdog.stop()
+    if exporter:
+        exporter.write()
+    if sync:
+        try:
+            sync.stop()
+        except OSError as e:
+            print(f"Warning: Could not sync progress: {e}")
+    if args.export_progress:
+        try:
+            export_progress(args.export_progress, student=args.student)
+        except OSError as e:
+            print(f"Warning: Could not export progress: {e}")
+    stop_recording()
+
 
 if __name__ == "__main__":
     main()
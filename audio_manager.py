@@ -1,48 +1,213 @@
 """
 Audio manager for playing sound effects
+Sounds are grouped into themes declared in sounds/manifest.json, or in the
+index of the sound library built by generate_sounds.py (sounds/index.json),
+which lists each clip at several sample rates. Clips are decoded on first use
+and kept in an LRU cache bounded by a memory budget.
 """
 
+import json
 import os
 import sys
+from collections import OrderedDict
+
+from metrics import get_metrics
 
 # Try to import pygame for audio, but don't fail if not available
 try:
     import pygame
     pygame.mixer.init()
     AUDIO_AVAILABLE = True
-except (ImportError, pygame.error):
+except ImportError:
     AUDIO_AVAILABLE = False
     print("Warning: Audio not available. Install pygame for sound effects: pip install pygame")
+except pygame.error:
+    AUDIO_AVAILABLE = False
+    print("Warning: Audio not available. Could not open the audio device")
+
+DEFAULT_THEME = "default"
+DEFAULT_CACHE_BUDGET = 8 * 1024 * 1024  # bytes of decoded audio kept in memory
+
+# Used when no manifest is present
+DEFAULT_MANIFEST = {
+    "default_theme": DEFAULT_THEME,
+    "themes": {
+        DEFAULT_THEME: {
+            "correct": "correct.wav",
+            "wrong": "wrong.wav"
+        }
+    }
+}
+
+
+def sound_size(sound):
+    """Estimate the decoded size of a pygame Sound in bytes"""
+    mixer_settings = pygame.mixer.get_init()
+    if not mixer_settings:
+        return 0
+    frequency, sample_format, channels = mixer_settings
+    return int(sound.get_length() * frequency * channels * (abs(sample_format) // 8))
+
+
+class SoundCache:
+    """LRU cache of decoded sounds, bounded by total size in bytes"""
+
+    def __init__(self, budget=DEFAULT_CACHE_BUDGET):
+        self.budget = budget
+        self.size = 0
+        self._entries = OrderedDict()
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, name):
+        """Return a cached sound and mark it as most recently used"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        self._entries.move_to_end(name)
+        return entry[0]
+
+    def put(self, name, sound, size):
+        """Add a sound, evicting the least recently used ones over budget"""
+        if name in self._entries:
+            self.size -= self._entries.pop(name)[1]
+        self._entries[name] = (sound, size)
+        self.size += size
+
+        # Always keep the newest clip, even if it alone exceeds the budget
+        while self.size > self.budget and len(self._entries) > 1:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def clear(self):
+        """Drop all cached sounds"""
+        self._entries.clear()
+        self.size = 0
 
 
 class AudioManager:
     """Manages audio playback for the application"""
 
-    def __init__(self):
+    def __init__(self, theme=None, cache_budget=DEFAULT_CACHE_BUDGET):
         self.sounds_dir = os.path.join(os.path.dirname(__file__), "sounds")
-        self.sounds = {}
+        self.sounds = SoundCache(cache_budget)
         self.enabled = AUDIO_AVAILABLE
+        self.manifest = self.load_manifest()
+        self.theme = theme or self.manifest.get("default_theme", DEFAULT_THEME)
+        self._missing = set()
+        # Play a number's chord when it is selected (app.py --number-prompts)
+        self.number_prompts = False
+        self.suspended = False
+        self.failures = get_metrics().counter("audio_failures_total", "Sounds that failed to load or play", ("reason",))
 
-        if self.enabled:
-            self.load_sounds()
+    def suspend(self):
+        """Release the audio device and the decoded clips (e.g. while the app is idle)"""
+        if not self.enabled:
+            return
+        # Sounds belong to the mixer, so they are decoded again after resume
+        self.sounds.clear()
+        self._missing.clear()
+        pygame.mixer.quit()
+        self.enabled = False
+        self.suspended = True
 
-    def load_sounds(self):
-        """Load sound files from the sounds directory"""
-        sound_files = {
-            'correct': 'correct.wav',
-            'wrong': 'wrong.wav'
-        }
+    def resume(self):
+        """Reopen the audio device released by suspend
 
-        for key, filename in sound_files.items():
-            filepath = os.path.join(self.sounds_dir, filename)
-            if os.path.exists(filepath):
-                try:
-                    self.sounds[key] = pygame.mixer.Sound(filepath)
-                except pygame.error as e:
-                    print(f"Warning: Could not load {filename}: {e}")
-            else:
-                # Create a simple beep sound programmatically
-                self.sounds[key] = self.create_beep(key)
+        Opening the device can take longer than a frame, so callers on the
+        input path should defer this (e.g. with root.after(0, ...)). On failure the
+        manager stays suspended and the next call tries again.
+        """
+        if not self.suspended:
+            return
+        try:
+            pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Warning: Could not reopen the audio device: {e}")
+            self.failures.inc(reason="resume")
+            return
+        self.suspended = False
+        self.enabled = True
+
+    def load_manifest(self):
+        """Load the library index, or else the theme manifest, from the sounds directory"""
+        for filename in ("index.json", "manifest.json"):
+            manifest_path = os.path.join(self.sounds_dir, filename)
+            if not os.path.exists(manifest_path):
+                continue
+            try:
+                with open(manifest_path, encoding="utf-8") as manifest_file:
+                    manifest = json.load(manifest_file)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not read sound manifest: {e}")
+                return DEFAULT_MANIFEST
+            # Without a library the index only records the default sounds' hashes
+            if manifest.get("themes"):
+                return manifest
+        return DEFAULT_MANIFEST
+
+    def themes(self):
+        """Return the names of all themes in the manifest"""
+        return sorted(self.manifest.get("themes", {}))
+
+    def set_theme(self, theme):
+        """Switch to another theme; its clips are loaded on first use"""
+        if theme != self.theme:
+            self.theme = theme
+            self.sounds.clear()
+            self._missing.clear()
+
+    def resolve(self, sound_name):
+        """Return the file path of a clip in the current theme (falling back to the default theme)"""
+        themes = self.manifest.get("themes", {})
+        default_theme = self.manifest.get("default_theme", DEFAULT_THEME)
+        for theme in (self.theme, default_theme):
+            filename = themes.get(theme, {}).get(sound_name)
+            if isinstance(filename, dict):
+                filename = self.pick_rate(filename)
+            if filename:
+                return os.path.join(self.sounds_dir, filename)
+        return None
+
+    def pick_rate(self, files_by_rate):
+        """Pick the file whose sample rate is closest to the mixer's, to avoid resampling"""
+        mixer_settings = pygame.mixer.get_init() if AUDIO_AVAILABLE else None
+        frequency = mixer_settings[0] if mixer_settings else 22050
+        rate = min(files_by_rate, key=lambda rate: abs(int(rate) - frequency), default=None)
+        return files_by_rate.get(rate)
+
+    def get_sound(self, sound_name):
+        """Return a decoded sound, loading it on first use"""
+        sound = self.sounds.get(sound_name)
+        if sound is not None or sound_name in self._missing:
+            return sound
+
+        sound = self.load_sound(sound_name)
+        if sound is None:
+            self._missing.add(sound_name)
+        else:
+            self.sounds.put(sound_name, sound, sound_size(sound))
+        return sound
+
+    def load_sound(self, sound_name):
+        """Decode a single clip from disk"""
+        filepath = self.resolve(sound_name)
+        if filepath and os.path.exists(filepath):
+            try:
+                return pygame.mixer.Sound(filepath)
+            except pygame.error as e:
+                print(f"Warning: Could not load {os.path.basename(filepath)}: {e}")
+                self.failures.inc(reason="load")
+                return None
+
+        if sound_name in ('correct', 'wrong'):
+            # Create a simple beep sound programmatically
+            return self.create_beep(sound_name)
+        return None
 
     def create_beep(self, sound_type):
         """Create a simple beep sound programmatically"""
@@ -88,11 +253,19 @@ class AudioManager:
 
     def play(self, sound_name):
         """Play a sound effect"""
-        if self.enabled and sound_name in self.sounds and self.sounds[sound_name]:
-            try:
-                self.sounds[sound_name].play()
-            except pygame.error:
-                pass  # Silently fail if audio playback fails
+        if self.suspended:
+            # A sound requested before the deferred resume ran (or after it failed)
+            self.resume()
+        if not self.enabled:
+            return
+
+        try:
+            sound = self.get_sound(sound_name)
+            if sound:
+                sound.play()
+        except pygame.error:
+            # Silently fail if audio playback fails
+            self.failures.inc(reason="play")
 
     def play_correct(self):
         """Play the correct answer sound"""
@@ -102,6 +275,13 @@ class AudioManager:
         """Play the wrong answer sound"""
         self.play('wrong')
 
+    def play_number(self, number, level):
+        """Play the prompt of a number (its level variant, if the library has one)"""
+        name = f'number_{number}_level{level}'
+        if self.resolve(name) is None:
+            name = f'number_{number}'
+        self.play(name)
+
 
 # Global audio manager instance
 _audio_manager = None
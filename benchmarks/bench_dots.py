@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Redraw-time benchmark for the dot backends
+Redraws a row of ten dots (as Level 1 does after each answer) with the oval
+and the sprite backend, including the time Tk takes to paint the canvas.
+
+Requires a display (on a headless machine use e.g. `xvfb-run`).
+
+Usage: python benchmarks/bench_dots.py [redraws]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tkinter as tk
+
+from dot_sprites import BACKENDS
+
+COLORS = ("#4CAF50", "#2196F3")
+
+
+def redraw(canvas, backend, left):
+    """Clear the canvas and draw ten dots split at left, like Level 1"""
+    canvas.delete("all")
+    for i in range(10):
+        x = 60 + i * 50 + (30 if i >= 5 else 0)
+        backend.draw(canvas, x, 125, 20, COLORS[0] if i < left else COLORS[1])
+
+
+def measure(root, canvas, backend, redraws):
+    """Return the mean redraw + paint time in ms"""
+    redraw(canvas, backend, 5)  # warm up caches
+    root.update()
+    start = time.perf_counter()
+    for index in range(redraws):
+        redraw(canvas, backend, index % 9 + 1)
+        root.update()
+    return (time.perf_counter() - start) * 1000 / redraws
+
+
+def main():
+    redraws = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    root = tk.Tk()
+    canvas = tk.Canvas(root, width=600, height=250, bg="white", highlightthickness=0)
+    canvas.pack()
+    root.update()
+
+    print(f"{'backend':<10}{'redraw (ms)':>14}")
+    for name, backend_class in sorted(BACKENDS.items()):
+        print(f"{name:<10}{measure(root, canvas, backend_class(), redraws):>14.3f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Wakeup and resume benchmark for the idle power-saving mode
+Runs the app with the metrics exporter, lag monitor and stall watchdog for a
+few seconds while active and while idle, and reports the CPU time and the
+voluntary context switches (a proxy for wakeups) of each period, then how
+long a keypress takes to restore the UI.
+
+Requires a display (on a headless machine use e.g. `xvfb-run`).
+
+Usage: python benchmarks/bench_idle.py [seconds]
+"""
+
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tkinter as tk
+
+from animation import get_animator
+from app import MathLearningApp
+from audio_manager import get_audio_manager
+from metrics import EventLoopLagMonitor, TextfileExporter, get_metrics
+from power import IdleManager
+from stall_watchdog import StallWatchdog
+
+RESUMES = 20
+
+
+def run_for(root, seconds):
+    """Run the event loop for a while; returns (CPU seconds, voluntary context switches)"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.process_time()
+    root.after(int(seconds * 1000), root.quit)
+    root.mainloop()
+    switches = resource.getrusage(resource.RUSAGE_SELF).ru_nvcsw - usage.ru_nvcsw
+    return time.process_time() - start, switches
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    directory = tempfile.mkdtemp()
+
+    root = tk.Tk()
+    MathLearningApp(root)
+    exporter = TextfileExporter(get_metrics(), os.path.join(directory, "metrics.prom"), 1.0)
+    exporter.start(root)
+    lag_monitor = EventLoopLagMonitor(get_metrics())
+    lag_monitor.start(root)
+    watchdog = StallWatchdog(root, log_path=os.path.join(directory, "stalls.log"))
+    watchdog.start()
+
+    idle = IdleManager(root, timeout=3600)
+    idle.add(get_animator(root).finish)
+    idle.add(watchdog.pause, watchdog.start)
+    idle.add(lag_monitor.stop, lambda: lag_monitor.start(root))
+    idle.add(exporter.stop, lambda: exporter.start(root))
+    audio = get_audio_manager()
+    idle.add(audio.suspend, lambda: root.after(0, audio.resume))
+    idle.start()
+    root.update()
+
+    print(f"{'state':>8}{'CPU (ms/s)':>12}{'ctx switches/s':>16}")
+    cpu, switches = run_for(root, seconds)
+    print(f"{'active':>8}{cpu * 1000 / seconds:>12.2f}{switches / seconds:>16.1f}")
+    idle.enter_idle()
+    cpu, switches = run_for(root, seconds)
+    print(f"{'idle':>8}{cpu * 1000 / seconds:>12.2f}{switches / seconds:>16.1f}")
+    print(f"Tk timers pending while idle: {idle.pending_timers_metric.value():.0f}")
+
+    latencies = []
+    for _ in range(RESUMES):
+        idle.enter_idle()
+        root.focus_force()
+        root.update()
+        start = time.perf_counter()
+        root.event_generate("<KeyPress>", keysym="space", when="now")
+        root.update_idletasks()
+        latencies.append(time.perf_counter() - start)
+        root.update()
+    latencies.sort()
+    print(f"Resume latency: median {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"max {latencies[-1] * 1000:.2f} ms (frame: 16.7 ms)")
+
+    watchdog.stop()
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Size and load-time benchmark for progress exports
+Compares the binary progress format against a JSON list of per-answer dicts:
+file size, export time, import time and peak memory while importing.
+
+Usage: python benchmarks/bench_progress.py [count]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_records import as_dict, make_answers
+from item_stats import ItemStats
+from progress import export_progress, import_progress
+from records import Answer, AnswerHistory
+
+
+def export_json(path, history):
+    with open(path, "w", encoding="utf-8") as json_file:
+        json.dump([as_dict(answer) for answer in history], json_file)
+
+
+def import_json(path, history, stats):
+    with open(path, encoding="utf-8") as json_file:
+        for entry in json.load(json_file):
+            answer = Answer(**entry)
+            history.append(answer)
+            stats.update(answer)
+
+
+def timed(function, *args):
+    """Return (seconds, peak traced KiB) of a call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] // 1024
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    history = AnswerHistory()
+    for answer in make_answers(count):
+        history.append(answer)
+
+    with tempfile.TemporaryDirectory() as directory:
+        binary_path = os.path.join(directory, "progress.mltp")
+        json_path = os.path.join(directory, "progress.json")
+
+        print(f"{count} answers")
+        print(f"{'format':<8}{'size (KiB)':>12}{'export (s)':>12}{'import (s)':>12}{'import peak (KiB)':>20}")
+        for name, path, export, load in (
+            ("json", json_path, export_json, import_json),
+            ("binary", binary_path, export_progress, import_progress),
+        ):
+            export_seconds = timed(export, path, history)[0]
+            import_seconds, peak = timed(load, path, AnswerHistory(), ItemStats())
+            size = os.path.getsize(path) // 1024
+            print(f"{name:<8}{size:>12}{export_seconds:>12.2f}{import_seconds:>12.2f}{peak:>20}")
+
+
+if __name__ == "__main__":
+    main()
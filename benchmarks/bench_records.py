@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for answer records
+Compares the footprint per answer of the packed AnswerHistory against a
+list of dicts and a list of slot-based Answer objects.
+
+Usage: python benchmarks/bench_records.py [count]
+"""
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from records import Answer, AnswerHistory
+
+
+def make_answers(count, seed=1):
+    """Yield random answers"""
+    rng = random.Random(seed)
+    for i in range(count):
+        number = rng.randint(4, 10)
+        left = rng.randint(0, number)
+        given_right = rng.randint(0, number)
+        yield Answer(rng.randint(1, 3), number, left, left, given_right,
+                     given_right == number - left, rng.randint(300, 9000), 1700000000 + i)
+
+
+def as_dict(answer):
+    return {name: getattr(answer, name) for name in Answer.__slots__}
+
+
+def measure(build, count):
+    """Return bytes allocated per answer by build(answers)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = build(make_answers(count))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+    return (after - before) / count
+
+
+def build_history(answers):
+    history = AnswerHistory()
+    for answer in answers:
+        history.append(answer)
+    return history
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print(f"Storing {count:,} answers")
+    print(f"{'storage':<24}{'bytes/answer':>14}")
+    for name, build in (
+        ("list of dicts", lambda answers: [as_dict(a) for a in answers]),
+        ("list of Answer", list),
+        ("AnswerHistory", build_history),
+    ):
+        print(f"{name:<24}{measure(build, count):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Memory and CPU benchmark for multi-seat mode
+Opens one seat, then adds seats one by one and reports the resident memory
+and the CPU time of a level/number switch round for every seat count. The
+first seat's footprint includes importing Tk and the app, so it is roughly
+what a separate process per child costs.
+
+Requires a display (on a headless machine use e.g. `xvfb-run`).
+
+Usage: python benchmarks/bench_seats.py [max_seats]
+"""
+
+import os
+import resource
+import sys
+import time
+
+
+def rss_kb():
+    """Current resident set size in KiB"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        # No /proc: fall back to the peak
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+# Taken before Tk and the app are imported, so the first seat includes their cost
+BASELINE_KB = rss_kb()
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tkinter as tk
+
+from app import MathLearningApp
+
+SWITCHES = 50
+
+
+def switch_round(root, seats):
+    """Return the CPU seconds for SWITCHES level/number switches on every seat"""
+    start = time.process_time()
+    for index in range(SWITCHES):
+        for app in seats:
+            app.select_level(index % 3 + 1)
+            app.select_number(index % 7 + 4)
+        root.update()
+    return time.process_time() - start
+
+
+def main():
+    max_seats = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+
+    root = tk.Tk()
+    root.withdraw()
+    seats = []
+    print(f"{'seats':>6}{'RSS (KiB)':>12}{'+ per seat':>12}{'CPU/round (ms)':>16}")
+    previous = None
+    for count in range(1, max_seats + 1):
+        seats.append(MathLearningApp(tk.Toplevel(root), seat=count))
+        root.update()
+        switch_round(root, seats)  # warm up the new seat
+        rss = rss_kb()
+        cpu = switch_round(root, seats) * 1000 / SWITCHES
+        added = rss - previous if previous is not None else rss - BASELINE_KB
+        print(f"{count:>6}{rss:>12}{added:>12}{cpu:>16.2f}")
+        previous = rss
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Teacher dashboard
+A heatmap of every student's accuracy per level and number, read from the
+progress sync folder (see progress_sync.py). The whole table is one Canvas:
+only the rows that fit in the window have canvas items, scrolling reuses
+them for other students, and new answers only repaint the cells that
+changed, so it stays responsive with thousands of students.
+
+Usage: python dashboard.py SYNC_FOLDER [--interval SECONDS]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tkinter as tk
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from animation import blend
+from progress import ProgressFileError
+from progress_sync import DELTA_SUFFIX, read_delta
+from records import FLAG_CORRECT
+from styles import get_font
+
+LEVELS = (1, 2, 3)
+NUMBERS = tuple(range(4, 11))
+
+ROW_HEIGHT = 24
+CELL_WIDTH = 34
+NAME_WIDTH = 160
+HEADER_HEIGHT = 44
+LEVEL_GAP = 10
+
+NO_DATA_COLOR = "#EEEEEE"
+LOW_COLOR = "#FF5722"
+MID_COLOR = "#FFEB3B"
+HIGH_COLOR = "#4CAF50"
+
+
+def accuracy_color(accuracy):
+    """Color of a heatmap cell: red below 50%, through yellow, to green at 100%"""
+    if accuracy is None:
+        return NO_DATA_COLOR
+    if accuracy < 0.5:
+        return LOW_COLOR
+    if accuracy < 0.75:
+        return blend(LOW_COLOR, MID_COLOR, (accuracy - 0.5) / 0.25)
+    return blend(MID_COLOR, HIGH_COLOR, (accuracy - 0.75) / 0.25)
+
+
+class ClassProgress:
+    """Answer counts per student and (level, number), read incrementally from a sync folder"""
+
+    def __init__(self, folder, levels=LEVELS, numbers=NUMBERS):
+        self.folder = folder
+        self.columns = [(level, number) for level in levels for number in numbers]
+        self._column_index = {column: index for index, column in enumerate(self.columns)}
+        self.students = []
+        self.attempts = {}
+        self.correct = {}
+        self._offsets = {}
+
+    def poll(self):
+        """Read the answers appended since the last poll
+
+        Returns (students whose counts changed, True if new students appeared).
+        """
+        changed = set()
+        added = False
+        for path in glob.glob(os.path.join(self.folder, "*", "*" + DELTA_SUFFIX)):
+            offset = self._offsets.get(path, 0)
+            try:
+                if offset and os.path.getsize(path) <= offset:
+                    continue
+                rows, self._offsets[path] = read_delta(path, offset)
+            except (OSError, ProgressFileError):
+                continue
+            if not rows:
+                continue
+
+            student = os.path.basename(os.path.dirname(path))
+            if student not in self.attempts:
+                self.attempts[student] = array("I", [0] * len(self.columns))
+                self.correct[student] = array("I", [0] * len(self.columns))
+                added = True
+            attempts, correct = self.attempts[student], self.correct[student]
+            for level, number, _, _, _, flags, _, _ in rows:
+                index = self._column_index.get((level, number))
+                if index is not None:
+                    attempts[index] += 1
+                    if flags & FLAG_CORRECT:
+                        correct[index] += 1
+            changed.add(student)
+
+        if added:
+            self.students = sorted(self.attempts)
+        return changed, added
+
+    def accuracy(self, student, column):
+        """Return the share of correct answers in a cell, or None without answers"""
+        attempts = self.attempts[student][column]
+        return self.correct[student][column] / attempts if attempts else None
+
+
+class TeacherDashboard(tk.Frame):
+    """Virtualized heatmap of a ClassProgress on a single Canvas"""
+
+    def __init__(self, parent, progress, interval=5.0):
+        super().__init__(parent, bg="white")
+        self.progress = progress
+        self.interval_ms = int(interval * 1000)
+        self.top = 0  # index of the first visible student
+        # Canvas items of each visible row slot: (name text, [cell rectangles])
+        self.slots = []
+        # Student and cell colors currently shown by each slot, to skip unchanged items
+        self.slot_students = []
+        self.slot_colors = []
+        self._after_id = None
+
+        self.canvas = tk.Canvas(self, bg="white", highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_rows(3))
+
+        self.draw_header()
+        self.poll()
+
+    def column_x(self, column):
+        """Left edge of a heatmap column"""
+        level_index = column // len(NUMBERS)
+        return NAME_WIDTH + column * CELL_WIDTH + level_index * LEVEL_GAP
+
+    def draw_header(self):
+        """Draw the level and number labels (once; they never scroll)"""
+        for level_index, level in enumerate(LEVELS):
+            x = self.column_x(level_index * len(NUMBERS))
+            self.canvas.create_text(
+                x + len(NUMBERS) * CELL_WIDTH / 2, 12,
+                text=f"Level {level}", font=get_font(self, "table_heading")
+            )
+        for column, (_, number) in enumerate(self.progress.columns):
+            self.canvas.create_text(
+                self.column_x(column) + CELL_WIDTH / 2, HEADER_HEIGHT - 12,
+                text=str(number), font=get_font(self, "table")
+            )
+
+    def visible_rows(self):
+        return max((self.canvas.winfo_height() - HEADER_HEIGHT) // ROW_HEIGHT, 0)
+
+    def on_resize(self, event=None):
+        """Create or remove row slots so that exactly the visible rows have items"""
+        wanted = self.visible_rows()
+        while len(self.slots) < wanted:
+            y = HEADER_HEIGHT + len(self.slots) * ROW_HEIGHT
+            name = self.canvas.create_text(8, y + ROW_HEIGHT / 2, anchor="w", font=get_font(self, "table"))
+            cells = [
+                self.canvas.create_rectangle(
+                    self.column_x(column) + 1, y + 1,
+                    self.column_x(column) + CELL_WIDTH - 1, y + ROW_HEIGHT - 1,
+                    outline="white", fill=NO_DATA_COLOR
+                )
+                for column in range(len(self.progress.columns))
+            ]
+            self.slots.append((name, cells))
+            self.slot_students.append(None)
+            self.slot_colors.append([NO_DATA_COLOR] * len(cells))
+        while len(self.slots) > wanted:
+            name, cells = self.slots.pop()
+            self.canvas.delete(name, *cells)
+            self.slot_students.pop()
+            self.slot_colors.pop()
+        self.scroll_rows(0)
+
+    def yview(self, *args):
+        """Scrollbar command: move to a fraction or scroll by units/pages"""
+        if args[0] == "moveto":
+            self.set_top(int(float(args[1]) * len(self.progress.students)))
+        elif args[0] == "scroll":
+            count = int(args[1])
+            self.scroll_rows(count * max(self.visible_rows() - 1, 1) if args[2] == "pages" else count)
+
+    def on_wheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def scroll_rows(self, count):
+        self.set_top(self.top + count)
+
+    def set_top(self, top):
+        """Show the students from index top on"""
+        total = len(self.progress.students)
+        self.top = max(min(top, total - len(self.slots)), 0)
+        self.paint_rows()
+        if total:
+            self.scrollbar.set(self.top / total, min((self.top + len(self.slots)) / total, 1.0))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def paint_rows(self, students=None):
+        """Repaint the visible rows (only those of the given students, if any)"""
+        names = self.progress.students
+        for slot, (name_item, cells) in enumerate(self.slots):
+            index = self.top + slot
+            student = names[index] if index < len(names) else None
+            if student != self.slot_students[slot]:
+                self.canvas.itemconfig(name_item, text=student or "")
+                self.slot_students[slot] = student
+            elif students is not None and student not in students:
+                continue
+            self.paint_cells(slot, student)
+
+    def paint_cells(self, slot, student):
+        """Recolor the cells of one row slot whose color changed"""
+        colors = self.slot_colors[slot]
+        for column, item in enumerate(self.slots[slot][1]):
+            color = accuracy_color(self.progress.accuracy(student, column)) if student else NO_DATA_COLOR
+            if colors[column] != color:
+                self.canvas.itemconfig(item, fill=color)
+                colors[column] = color
+
+    def poll(self):
+        """Read new answers and repaint what they changed"""
+        changed, added = self.progress.poll()
+        if added:
+            self.set_top(self.top)
+        elif changed:
+            self.paint_rows(changed)
+        self._after_id = self.after(self.interval_ms, self.poll)
+
+    def pause(self):
+        """Stop polling"""
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+
+    def resume(self):
+        """Catch up on the answers given while paused and poll again"""
+        if self._after_id is None and self.winfo_exists():
+            self.poll()
+
+    def destroy(self):
+        """Stop polling before destroying the widget"""
+        self.pause()
+        super().destroy()
+
+
+def open_dashboard(root, folder, interval=5.0):
+    """Open the dashboard in its own window next to the app"""
+    window = tk.Toplevel(root)
+    window.title("Math Learning Tool - Teacher Dashboard")
+    window.geometry("900x600")
+    dashboard = TeacherDashboard(window, ClassProgress(folder), interval)
+    dashboard.pack(fill="both", expand=True)
+    return dashboard
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teacher dashboard")
+    parser.add_argument("folder", help="progress sync folder (see app.py --sync-folder)")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between refreshes (default: 5)")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.title("Math Learning Tool - Teacher Dashboard")
+    root.geometry("900x600")
+    TeacherDashboard(root, ClassProgress(args.folder), args.interval).pack(fill="both", expand=True)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
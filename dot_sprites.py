@@ -0,0 +1,169 @@
+"""
+Dot drawing backends for the level canvases
+"oval" draws every dot as a vector oval, which Tk rasterizes on each redraw.
+"sprite" renders an antialiased dot once per (color, radius) into a cached
+PhotoImage and places it as an image item, which is much cheaper to redraw
+on slow graphics. The backend is chosen once at startup (app.py --dot-backend).
+"""
+
+import base64
+import struct
+import tkinter as tk
+import zlib
+
+DEFAULT_BACKEND = "oval"
+
+OUTLINE_COLOR = "#333"
+OUTLINE_WIDTH = 2
+
+SUPERSAMPLING = 4  # samples per pixel side for antialiasing
+
+
+class OvalBackend:
+    """Draws dots as canvas ovals"""
+
+    name = "oval"
+
+    def draw(self, canvas, x, y, radius, fill, outline=OUTLINE_COLOR, tags=()):
+        """Draw a dot centered on (x, y); returns its canvas item"""
+        return canvas.create_oval(
+            x - radius, y - radius,
+            x + radius, y + radius,
+            fill=fill,
+            outline=outline,
+            width=OUTLINE_WIDTH,
+            tags=tags
+        )
+
+    def recolor(self, canvas, item, radius, fill, outline=OUTLINE_COLOR):
+        """Change the colors of a dot (or of all dots with a tag)"""
+        canvas.itemconfig(item, fill=fill, outline=outline)
+
+
+def _parse_color(color):
+    """Return the (r, g, b) of a #rgb or #rrggbb color"""
+    color = color.lstrip("#")
+    if len(color) == 3:
+        color = "".join(c * 2 for c in color)
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def _png(width, height, rows):
+    """Encode RGBA rows (bytes of width * 4) as a PNG"""
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    raw = b"".join(b"\x00" + row for row in rows)  # filter type 0 per row
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw))
+            + chunk(b"IEND", b""))
+
+
+class SpriteBackend:
+    """Draws dots as cached, pre-rendered antialiased images"""
+
+    name = "sprite"
+
+    def __init__(self):
+        # (radius) -> (size, [(outer coverage, inner coverage)] per pixel)
+        self._coverage = {}
+
+    def coverage(self, radius):
+        """Per-pixel coverage of the dot and of its fill, computed once per radius"""
+        cached = self._coverage.get(radius)
+        if cached is not None:
+            return cached
+
+        # The outline is centered on the dot's edge, like Tk's oval outline
+        outer = radius + OUTLINE_WIDTH / 2
+        inner = radius - OUTLINE_WIDTH / 2
+        size = int(outer * 2) + 2
+        center = size / 2
+        step = 1 / SUPERSAMPLING
+        offsets = [(i + 0.5) * step for i in range(SUPERSAMPLING)]
+        samples = SUPERSAMPLING * SUPERSAMPLING
+
+        pixels = []
+        for py in range(size):
+            for px in range(size):
+                outer_hits = inner_hits = 0
+                for oy in offsets:
+                    dy = py + oy - center
+                    for ox in offsets:
+                        dx = px + ox - center
+                        distance = dx * dx + dy * dy
+                        if distance <= outer * outer:
+                            outer_hits += 1
+                            if distance <= inner * inner:
+                                inner_hits += 1
+                pixels.append((outer_hits / samples, inner_hits / samples))
+        cached = self._coverage[radius] = (size, pixels)
+        return cached
+
+    def render(self, radius, fill, outline):
+        """Render a dot sprite as PNG data"""
+        size, pixels = self.coverage(radius)
+        fill_rgb = _parse_color(fill)
+        outline_rgb = _parse_color(outline)
+
+        rows = []
+        for py in range(size):
+            row = bytearray()
+            for outer, inner in pixels[py * size:(py + 1) * size]:
+                if outer == 0:
+                    row += b"\x00\x00\x00\x00"
+                    continue
+                # Fill where the inner disk covers the pixel, outline for the rest
+                share = inner / outer
+                row += bytes(
+                    int(f * share + o * (1 - share) + 0.5) for f, o in zip(fill_rgb, outline_rgb)
+                )
+                row.append(int(outer * 255 + 0.5))
+            rows.append(bytes(row))
+        return _png(size, size, rows)
+
+    def sprite(self, canvas, radius, fill, outline):
+        """Return the cached PhotoImage of a dot, rendering it on first use"""
+        # Images belong to a Tk interpreter, so the cache lives on the root
+        root = canvas._root()
+        sprites = getattr(root, "_dot_sprites", None)
+        if sprites is None:
+            sprites = root._dot_sprites = {}
+        key = (radius, fill, outline)
+        image = sprites.get(key)
+        if image is None:
+            data = base64.b64encode(self.render(radius, fill, outline)).decode("ascii")
+            image = sprites[key] = tk.PhotoImage(master=root, data=data, format="png")
+        return image
+
+    def draw(self, canvas, x, y, radius, fill, outline=OUTLINE_COLOR, tags=()):
+        return canvas.create_image(x, y, image=self.sprite(canvas, radius, fill, outline), tags=tags)
+
+    def recolor(self, canvas, item, radius, fill, outline=OUTLINE_COLOR):
+        canvas.itemconfig(item, image=self.sprite(canvas, radius, fill, outline))
+
+
+BACKENDS = {
+    OvalBackend.name: OvalBackend,
+    SpriteBackend.name: SpriteBackend,
+}
+
+# Global dot backend shared by all levels
+_dot_backend = None
+
+
+def set_dot_backend(name):
+    """Choose the dot backend (call before the first level is built)"""
+    global _dot_backend
+    _dot_backend = BACKENDS[name]()
+    return _dot_backend
+
+
+def get_dot_backend():
+    """Get the dot backend used by the levels"""
+    global _dot_backend
+    if _dot_backend is None:
+        _dot_backend = BACKENDS[DEFAULT_BACKEND]()
+    return _dot_backend
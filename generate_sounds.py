@@ -1,65 +1,238 @@
 #!/usr/bin/env python3
 """
-Generate simple WAV sound files for the math learning tool
-Run this script to create correct.wav and wrong.wav in the sounds/ directory
+Generate WAV sound files for the math learning tool
+Builds the default feedback sounds (sounds/correct.wav and wrong.wav) and the
+sound library described by sounds/library.json: several themes,
+each with feedback sounds and a distinct chord per number (with per-level
+variants), at every listed sample rate. Outputs whose content hash is up to
+date are skipped; the rest are synthesized in a process pool. Finally a
+compact index (sounds/index.json) is written, which AudioManager loads in a
+single read.
+
+Usage: python generate_sounds.py [LIBRARY] [--workers N] [--force]
 """
 
+import argparse
+import hashlib
+import json
+import math
 import os
+import sys
+import time
 import wave
-import math
-import struct
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 
+SOUNDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sounds')
+DEFAULT_LIBRARY = os.path.join(SOUNDS_DIR, 'library.json')
+INDEX_FILE = 'index.json'
+LIBRARY_DIR = 'library'
 
-def generate_beep(filename, frequency, duration=0.3, sample_rate=22050):
-    """Generate a simple beep sound and save as WAV file"""
-    num_samples = int(sample_rate * duration)
+# Bumped whenever synthesis changes, so every output is rebuilt
+GENERATOR_VERSION = 1
+INDEX_VERSION = 1
 
-    with wave.open(filename, 'w') as wav_file:
-        # Set WAV file parameters
-        wav_file.setnchannels(1)  # Mono
-        wav_file.setsampwidth(2)  # 2 bytes per sample (16-bit)
-        wav_file.setframerate(sample_rate)
+# Semitones above the base note for numbers 4..10 (a major scale)
+NUMBER_STEPS = (0, 2, 4, 5, 7, 9, 11)
 
-        # Generate sine wave samples with envelope
-        for i in range(num_samples):
-            # Calculate sine wave value
-            t = i / sample_rate
-            value = math.sin(2 * math.pi * frequency * t)
+# Chord intervals (semitones) per level: a single tone, a fifth, a major triad
+LEVEL_CHORDS = {1: (0,), 2: (0, 7), 3: (0, 4, 7)}
 
-            # Apply envelope to avoid clicks
-            if i < sample_rate * 0.01:  # Attack
-                envelope = i / (sample_rate * 0.01)
-            elif i > num_samples - sample_rate * 0.01:  # Release
-                envelope = (num_samples - i) / (sample_rate * 0.01)
-            else:  # Sustain
-                envelope = 1.0
+ENVELOPE_SECONDS = 0.01  # attack and release, to avoid clicks
 
-            value *= envelope
+# Fallback feedback sounds (sounds/correct.wav and wrong.wav): name -> (frequency, duration)
+DEFAULT_SOUNDS = {
+    'correct': (880, 0.25),  # higher pitch - A5 = 880 Hz
+    'wrong': (261, 0.3),     # lower pitch - C4 = 261 Hz
+}
+DEFAULT_RATE = 22050
 
-            # Convert to 16-bit integer
-            sample = int(value * 32767)
-            wav_file.writeframes(struct.pack('<h', sample))
 
-    print(f"Generated: {filename}")
+def synthesize(frequencies, duration, sample_rate, volume=1.0):
+    """Return 16-bit mono samples of a chord with an attack/release envelope"""
+    num_samples = int(sample_rate * duration)
+    ramp = sample_rate * ENVELOPE_SECONDS
+    steps = [2 * math.pi * frequency / sample_rate for frequency in frequencies]
+    scale = 32767 * volume / len(frequencies)
+
+    samples = array('h', bytes(2 * num_samples))
+    for i in range(num_samples):
+        value = sum(math.sin(step * i) for step in steps)
 
+        # Apply envelope to avoid clicks
+        if i < ramp:  # Attack
+            value *= i / ramp
+        elif i > num_samples - ramp:  # Release
+            value *= (num_samples - i) / ramp
 
-def main():
+        samples[i] = int(value * scale)
+    return samples
+
+
+def write_wav(filename, samples, sample_rate):
+    """Write 16-bit mono samples as a WAV file"""
+    if sys.byteorder == 'big':
+        samples = array('h', samples)
+        samples.byteswap()
+    with wave.open(filename, 'w') as wav_file:
+        wav_file.setnchannels(1)  # Mono
+        wav_file.setsampwidth(2)  # 2 bytes per sample (16-bit)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.tobytes())
+
+
+def file_digest(path):
+    """Return the SHA-1 of a file's content, or None if it doesn't exist"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def number_frequencies(base, number, level):
+    """Return the chord of a number prompt: the number picks the root, the level the chord"""
+    step = NUMBER_STEPS[(number - 4) % len(NUMBER_STEPS)] + 12 * ((number - 4) // len(NUMBER_STEPS))
+    root = base * 2 ** (step / 12)
+    return [root * 2 ** (interval / 12) for interval in LEVEL_CHORDS[level]]
+
+
+def make_job(theme, name, rate, tones, duration, volume, path):
+    """Return a synthesis job, with the hash of everything that determines its output"""
+    job = {
+        'theme': theme,
+        'name': name,
+        'rate': rate,
+        'tones': [round(tone, 3) for tone in tones],
+        'duration': duration,
+        'volume': volume,
+    }
+    job['path'] = path
+    job['hash'] = hashlib.sha1(json.dumps([GENERATOR_VERSION, job], sort_keys=True).encode()).hexdigest()
+    return job
+
+
+def default_jobs():
+    """Jobs of the fallback feedback sounds; they belong to no theme of the index"""
+    return [
+        make_job(None, name, DEFAULT_RATE, [frequency], duration, 1.0, f'{name}.wav')
+        for name, (frequency, duration) in DEFAULT_SOUNDS.items()
+    ]
+
+
+def expand_library(library):
+    """Turn the library manifest into a list of synthesis jobs"""
+    jobs = []
+    for theme, spec in sorted(library.get('themes', {}).items()):
+        volume = spec.get('volume', 1.0)
+        sounds = {}
+        for name, sound in spec.get('sounds', {}).items():
+            sounds[name] = (sound['tones'], sound.get('duration', 0.3))
+
+        numbers = spec.get('numbers')
+        if numbers:
+            for number in range(numbers.get('from', 4), numbers.get('to', 10) + 1):
+                for level in numbers.get('levels', sorted(LEVEL_CHORDS)):
+                    tones = number_frequencies(numbers.get('base', 261.63), number, level)
+                    sounds[f'number_{number}_level{level}'] = (tones, numbers.get('duration', 0.4))
+
+        for name, (tones, duration) in sorted(sounds.items()):
+            for rate in library.get('sample_rates', [DEFAULT_RATE]):
+                jobs.append(make_job(theme, name, rate, tones, duration, volume,
+                                     f'{LIBRARY_DIR}/{theme}/{rate}/{name}.wav'))
+    return jobs
+
+
+def build(job, sounds_dir=SOUNDS_DIR):
+    """Synthesize one job's WAV file; returns (path, digest of the written file)"""
+    filename = os.path.join(sounds_dir, job['path'])
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    samples = synthesize(job['tones'], job['duration'], job['rate'], job['volume'])
+    write_wav(filename, samples, job['rate'])
+    return job['path'], file_digest(filename)
+
+
+def load_index(sounds_dir=SOUNDS_DIR):
+    """Load the previous index, or an empty one"""
+    try:
+        with open(os.path.join(sounds_dir, INDEX_FILE), encoding='utf-8') as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return {}
+    return index if index.get('version') == INDEX_VERSION else {}
+
+
+def write_index(library, jobs, digests, sounds_dir=SOUNDS_DIR):
+    """Write the compact index: theme -> sound -> sample rate -> file, plus hashes"""
+    themes = {}
+    for job in jobs:
+        if job['theme'] is None:
+            continue
+        themes.setdefault(job['theme'], {}).setdefault(job['name'], {})[str(job['rate'])] = job['path']
+    index = {
+        'version': INDEX_VERSION,
+        'default_theme': library.get('default_theme', 'default'),
+        'themes': themes,
+        'hashes': {job['path']: [job['hash'], digests[job['path']]] for job in jobs},
+    }
+    path = os.path.join(sounds_dir, INDEX_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as index_file:
+        json.dump(index, index_file, separators=(',', ':'), sort_keys=True)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def build_library(library, workers=None, force=False, sounds_dir=SOUNDS_DIR):
+    """Build all outdated outputs of a library and the default sounds; returns (built, skipped) counts"""
+    jobs = default_jobs() + expand_library(library)
+    previous = load_index(sounds_dir).get('hashes', {})
+
+    digests = {}
+    outdated = []
+    for job in jobs:
+        recorded = previous.get(job['path'])
+        # Up to date if built from the same spec and the file is unchanged since
+        if not force and recorded and recorded[0] == job['hash']:
+            digest = file_digest(os.path.join(sounds_dir, job['path']))
+            if digest == recorded[1]:
+                digests[job['path']] = digest
+                continue
+        outdated.append(job)
+
+    if outdated:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, digest in pool.map(build, outdated, [sounds_dir] * len(outdated), chunksize=4):
+                digests[path] = digest
+
+    write_index(library, jobs, digests, sounds_dir)
+    return len(outdated), len(jobs) - len(outdated)
+
+
+def main(argv=None):
     """Generate sound files"""
-    # Create sounds directory if it doesn't exist
-    sounds_dir = os.path.join(os.path.dirname(__file__), 'sounds')
-    os.makedirs(sounds_dir, exist_ok=True)
+    parser = argparse.ArgumentParser(description="Generate the sound library")
+    parser.add_argument('library', nargs='?', default=DEFAULT_LIBRARY,
+                        help="library manifest (default: sounds/library.json)")
+    parser.add_argument('--workers', type=int, help="worker processes (default: all CPU cores)")
+    parser.add_argument('--force', action='store_true', help="rebuild everything, even if up to date")
+    args = parser.parse_args(argv)
 
-    # Generate correct sound (higher pitch - A5 = 880 Hz)
-    correct_file = os.path.join(sounds_dir, 'correct.wav')
-    generate_beep(correct_file, frequency=880, duration=0.25)
+    # Create sounds directory if it doesn't exist
+    os.makedirs(SOUNDS_DIR, exist_ok=True)
 
-    # Generate wrong sound (lower pitch - C4 = 261 Hz)
-    wrong_file = os.path.join(sounds_dir, 'wrong.wav')
-    generate_beep(wrong_file, frequency=261, duration=0.3)
+    library = {}
+    if os.path.exists(args.library):
+        with open(args.library, encoding='utf-8') as library_file:
+            library = json.load(library_file)
+    else:
+        print(f"No library manifest at {args.library}, only the default sounds are built")
 
-    print("\nSound files created successfully!")
-    print(f"Location: {sounds_dir}")
+    start = time.perf_counter()
+    built, skipped = build_library(library, workers=args.workers, force=args.force)
+    print(f"\nSound library: {built} built, {skipped} up to date ({time.perf_counter() - start:.2f} s)")
+    print(f"Location: {SOUNDS_DIR}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Online per-item statistics
+Running statistics for every (level, number, split) item, updated in O(1)
+as each answer is recorded: attempts, error rate, mean and variance of the
+response time (Welford's algorithm) and an exponentially decayed recent
+accuracy. Memory is one small record per item, however long the session.
+"""
+
+import math
+
+# Weight of the newest answer in the recent accuracy
+DEFAULT_DECAY = 0.2
+
+
+def item_key(level, number, left):
+    """Pack an item into a single int key"""
+    return (level << 32) | (number << 16) | left
+
+
+class ItemStat:
+    """Running statistics of one item"""
+
+    __slots__ = ("attempts", "errors", "mean_ms", "_m2", "recent_accuracy")
+
+    def __init__(self):
+        self.attempts = 0
+        self.errors = 0
+        self.mean_ms = 0.0
+        self._m2 = 0.0
+        self.recent_accuracy = None
+
+    def update(self, correct, response_ms, decay=DEFAULT_DECAY):
+        """Add one answer"""
+        self.attempts += 1
+        if not correct:
+            self.errors += 1
+
+        # Welford's online mean and variance
+        delta = response_ms - self.mean_ms
+        self.mean_ms += delta / self.attempts
+        self._m2 += delta * (response_ms - self.mean_ms)
+
+        outcome = 1.0 if correct else 0.0
+        if self.recent_accuracy is None:
+            self.recent_accuracy = outcome
+        else:
+            self.recent_accuracy += decay * (outcome - self.recent_accuracy)
+
+    @property
+    def error_rate(self):
+        return self.errors / self.attempts if self.attempts else 0.0
+
+    @property
+    def variance_ms(self):
+        """Sample variance of the response time"""
+        return self._m2 / (self.attempts - 1) if self.attempts > 1 else 0.0
+
+    @property
+    def stddev_ms(self):
+        return math.sqrt(self.variance_ms)
+
+    def __repr__(self):
+        return (f"ItemStat(attempts={self.attempts}, error_rate={self.error_rate:.2f}, "
+                f"mean_ms={self.mean_ms:.0f}, stddev_ms={self.stddev_ms:.0f}, "
+                f"recent_accuracy={self.recent_accuracy})")
+
+
+class ItemStats:
+    """Statistics of all items seen so far"""
+
+    def __init__(self, decay=DEFAULT_DECAY):
+        self.decay = decay
+        self._items = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def update(self, answer):
+        """Add an answer to its item's statistics"""
+        self.update_item(answer.level, answer.number, answer.left, answer.correct, answer.response_ms)
+
+    def update_item(self, level, number, left, correct, response_ms):
+        """Add an answer given as plain values"""
+        key = item_key(level, number, left)
+        stat = self._items.get(key)
+        if stat is None:
+            stat = self._items[key] = ItemStat()
+        stat.update(correct, response_ms, self.decay)
+
+    def get(self, level, number, left):
+        """Return the statistics of an item, or None if it was never answered"""
+        return self._items.get(item_key(level, number, left))
+
+    def items(self):
+        """Yield ((level, number, left), ItemStat) for every item"""
+        for key, stat in self._items.items():
+            yield (key >> 32, (key >> 16) & 0xFFFF, key & 0xFFFF), stat
+
+    def clear(self):
+        """Forget all statistics"""
+        self._items.clear()
+
+
+# Global item statistics, updated by records.record_answer
+_item_stats = None
+
+
+def get_item_stats():
+    """Get the global item statistics"""
+    global _item_stats
+    if _item_stats is None:
+        _item_stats = ItemStats()
+    return _item_stats
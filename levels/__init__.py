@@ -1,9 +1,17 @@
 """
 Level implementations for the Math Learning Tool
+Level classes are imported lazily so that only the selected level's module
+is loaded; see levels.registry.
 """
 
-from .level1 import Level1
-from .level2 import Level2
-from .level3 import Level3
+from .registry import get_level_registry
 
-__all__ = ['Level1', 'Level2', 'Level3']
+__all__ = ['Level1', 'Level2', 'Level3', 'get_level_registry']
+
+_LEVEL_IDS = {'Level1': 1, 'Level2': 2, 'Level3': 3}
+
+
+def __getattr__(name):
+    if name in _LEVEL_IDS:
+        return get_level_registry().get(_LEVEL_IDS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,237 @@
+"""
+Batch exercise compiler
+Compiles a declarative spec into a large batch of related exercises in one
+call, for example:
+
+    compile_exercises({
+        "family": "subtraction",   # split, subtraction, missing_first, three_part
+        "level": 3,
+        "numbers": {"from": 4, "to": 10},  # inclusive range, or a list of numbers
+        "count": 20000,
+        "seed": 7,
+        "unique": True,            # suppress duplicate exercises
+        "include_tags": ["double"],
+        "exclude_tags": ["zero"],
+    })
+
+Exercises are drawn in vectorized rounds (with numpy when it is installed)
+and stored in packed arrays; Exercise records are only created while a level
+iterates over the batch.
+"""
+
+import random
+import sys
+import os
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from levels.decompositions import TAG_NAMES, get_decomposition_index
+from levels.logic import LOGIC_CLASSES, NUMBERS
+from records import Exercise, FAMILIES, FAMILY_THREE_PART
+
+# Optional: numpy makes large batches much faster
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TAGS_BY_NAME = {name: tag for tag, name in TAG_NAMES.items()}
+
+MAX_ROUNDS = 64
+
+
+class ExerciseBatch:
+    """Compiled exercises of one family, stored column-wise"""
+
+    def __init__(self, spec, level, family, numbers, lefts, firsts):
+        self.spec = spec
+        self.level = level
+        self.family = family
+        self.families = {family}
+        self.numbers = numbers
+        self.lefts = lefts
+        self.firsts = firsts
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __getitem__(self, index):
+        return Exercise(self.level, self.numbers[index], self.lefts[index], shown_at=0.0,
+                        family=self.family, first=self.firsts[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+def _parse_tags(names):
+    tags = 0
+    for name in names or ():
+        if name not in TAGS_BY_NAME:
+            raise ValueError(f"Unknown tag {name!r}, expected one of {sorted(TAGS_BY_NAME)}")
+        tags |= TAGS_BY_NAME[name]
+    return tags
+
+
+def _parse_numbers(numbers):
+    """Numbers of a {"from": .., "to": ..} inclusive range, or of a list"""
+    if isinstance(numbers, dict):
+        return list(range(numbers["from"], numbers["to"] + 1))
+    return list(numbers)
+
+
+def _draw_python(rng, numbers, candidates, family, size):
+    """Draw size raw (number, left, first) rows with the random module"""
+    rows = []
+    for _ in range(size):
+        number = rng.choice(numbers)
+        if family == FAMILY_THREE_PART:
+            # Three non-empty parts: 1 <= first < left < number
+            first = rng.randint(1, number - 2)
+            left = first + rng.randint(1, number - 1 - first)
+        else:
+            lefts = candidates[number]
+            left = lefts[rng.randrange(len(lefts))]
+            first = 0
+        rows.append((number, left, first))
+    return rows
+
+
+def _draw_numpy(rng, numbers, candidates, family, size):
+    """Draw size raw rows as three numpy arrays"""
+    drawn = rng.choice(np.asarray(numbers, dtype=np.int64), size=size)
+    if family == FAMILY_THREE_PART:
+        first = (rng.random(size) * (drawn - 2)).astype(np.int64) + 1
+        second = (rng.random(size) * (drawn - 1 - first)).astype(np.int64) + 1
+        return drawn, first + second, first
+
+    lefts = np.empty(size, dtype=np.int64)
+    for number in numbers:
+        mask = drawn == number
+        count = int(mask.sum())
+        if count:
+            choices = np.frombuffer(candidates[number], dtype=np.uint16)
+            lefts[mask] = choices[rng.integers(0, len(choices), size=count)]
+    return drawn, lefts, np.zeros(size, dtype=np.int64)
+
+
+def _space_size(numbers, candidates, family):
+    """Return how many distinct exercises the spec allows"""
+    if family == FAMILY_THREE_PART:
+        return sum((n - 1) * (n - 2) // 2 for n in numbers)
+    return sum(len(candidates[n]) for n in numbers)
+
+
+def _enumerate(numbers, candidates, family):
+    """Yield every distinct (number, left, first) row the spec allows"""
+    for number in numbers:
+        if family == FAMILY_THREE_PART:
+            for first in range(1, number - 1):
+                for left in range(first + 1, number):
+                    yield number, left, first
+        else:
+            for left in candidates[number]:
+                yield number, left, 0
+
+
+def compile_exercises(spec):
+    """Compile a spec into an ExerciseBatch"""
+    family = spec.get("family", "split")
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown family {family!r}, expected one of {FAMILIES}")
+    level = spec.get("level", 3)
+    if level not in LOGIC_CLASSES:
+        raise ValueError(f"Unknown level {level!r}")
+    if family not in LOGIC_CLASSES[level].families:
+        raise ValueError(f"Level {level} cannot show {family} exercises")
+
+    numbers = _parse_numbers(spec.get("numbers", {"from": NUMBERS.start, "to": NUMBERS.stop - 1}))
+    unsupported = [n for n in numbers if n not in NUMBERS]
+    if unsupported:
+        raise ValueError(f"Numbers {unsupported} are outside {NUMBERS.start}-{NUMBERS.stop - 1}")
+    count = spec.get("count", 100)
+    unique = spec.get("unique", True)
+    include = _parse_tags(spec.get("include_tags"))
+    exclude = _parse_tags(spec.get("exclude_tags"))
+
+    index = get_decomposition_index()
+    candidates = {}
+    if family == FAMILY_THREE_PART:
+        # Tags describe two-part splits
+        if include or exclude:
+            raise ValueError("Tags cannot filter three_part exercises")
+        numbers = [n for n in numbers if n >= 3]
+    else:
+        for number in numbers:
+            candidates[number] = index.candidates(number, level, include, exclude)
+        numbers = [n for n in numbers if len(candidates[n])]
+    if not numbers:
+        raise ValueError("No exercises match the spec")
+
+    # The stored spec always carries the seed and generator, so the batch can be recompiled
+    spec = dict(spec)
+    seed = spec.setdefault("seed", random.randrange(2 ** 32))
+    use_numpy = spec.setdefault("numpy", np is not None)
+    if use_numpy and np is None:
+        # The random module draws a different batch from the same seed
+        raise ValueError("The spec was compiled with numpy, which is not installed; "
+                         "install numpy to recompile the same exercises")
+    rng = np.random.default_rng(seed) if use_numpy else random.Random(seed)
+
+    out_numbers, out_lefts, out_firsts = array("H"), array("H"), array("H")
+
+    space = _space_size(numbers, candidates, family) if unique else 0
+    if unique and count * 2 >= space:
+        # Most of the space is requested: shuffle all of it instead of rejection sampling
+        rows = list(_enumerate(numbers, candidates, family))
+        if use_numpy:
+            rows = [rows[i] for i in rng.permutation(len(rows)).tolist()]
+        else:
+            rng.shuffle(rows)
+        for number, left, first in rows[:count]:
+            out_numbers.append(number)
+            out_lefts.append(left)
+            out_firsts.append(first)
+        return ExerciseBatch(spec, level, family, out_numbers, out_lefts, out_firsts)
+
+    seen = set()
+    for _ in range(MAX_ROUNDS):
+        missing = count - len(out_numbers)
+        if missing <= 0:
+            break
+        # Over-draw when deduplicating, duplicates are dropped below
+        size = missing * 2 if unique else missing
+        if use_numpy:
+            drawn, lefts, firsts = _draw_numpy(rng, numbers, candidates, family, size)
+            if unique:
+                keys = (drawn << 32) | (lefts << 16) | firsts
+                _, first_index = np.unique(keys, return_index=True)
+                first_index.sort()
+                rows = [
+                    (n, l, f) for n, l, f, key in zip(
+                        drawn[first_index].tolist(), lefts[first_index].tolist(),
+                        firsts[first_index].tolist(), keys[first_index].tolist()
+                    )
+                    if key not in seen
+                ]
+                seen.update((n << 32) | (l << 16) | f for n, l, f in rows)
+            else:
+                rows = zip(drawn.tolist(), lefts.tolist(), firsts.tolist())
+        else:
+            rows = _draw_python(rng, numbers, candidates, family, size)
+            if unique:
+                fresh = []
+                for row in rows:
+                    if row not in seen:
+                        seen.add(row)
+                        fresh.append(row)
+                rows = fresh
+
+        for number, left, first in rows:
+            if len(out_numbers) == count:
+                break
+            out_numbers.append(number)
+            out_lefts.append(left)
+            out_firsts.append(first)
+
+    return ExerciseBatch(spec, level, family, out_numbers, out_lefts, out_firsts)
@@ -0,0 +1,176 @@
+"""
+Decomposition index
+Every split of a number into left + right, tagged with a difficulty class and
+with which levels may use it. Per-number tables are built once and cached, so
+lookups and filtered sampling are O(1) for number ranges in the thousands.
+"""
+
+from array import array
+
+# Difficulty tags (bit flags)
+TAG_ZERO = 0x01         # one part is 0 (n = n + 0)
+TAG_ONE = 0x02          # one part is 1
+TAG_DOUBLE = 0x04       # both parts are equal (4 = 2 + 2)
+TAG_NEAR_DOUBLE = 0x08  # parts differ by one (7 = 3 + 4)
+TAG_MAKE_TEN = 0x10     # the number is 10 (pairs that make ten)
+TAG_FIVE = 0x20         # one part is 5 (anchored on a full group of five)
+
+TAG_NAMES = {
+    TAG_ZERO: "zero",
+    TAG_ONE: "one",
+    TAG_DOUBLE: "double",
+    TAG_NEAR_DOUBLE: "near_double",
+    TAG_MAKE_TEN: "make_ten",
+    TAG_FIVE: "five",
+}
+
+# Difficulty class of a split: the first matching tag in this order
+DIFFICULTY_ORDER = (TAG_ZERO, TAG_ONE, TAG_DOUBLE, TAG_MAKE_TEN, TAG_NEAR_DOUBLE, TAG_FIVE)
+
+# Bit per level: which splits each level may ask for
+LEVEL_BITS = {1: 0x01, 2: 0x02, 3: 0x04}
+
+MAX_PART = 0xFFFF
+
+
+def split_tags(number, left):
+    """Return the difficulty tags of number = left + (number - left)"""
+    right = number - left
+    tags = 0
+    if left == 0 or right == 0:
+        tags |= TAG_ZERO
+    if left == 1 or right == 1:
+        tags |= TAG_ONE
+    if left == right:
+        tags |= TAG_DOUBLE
+    if abs(left - right) == 1:
+        tags |= TAG_NEAR_DOUBLE
+    if number == 10:
+        tags |= TAG_MAKE_TEN
+    if left == 5 or right == 5:
+        tags |= TAG_FIVE
+    return tags
+
+
+def split_levels(number, left):
+    """Return the level bits of the levels that may use this split"""
+    levels = LEVEL_BITS[3]  # Level 3 allows 0..n
+    if 0 < left < number:
+        # Levels 1 and 2 always show dots on both sides
+        levels |= LEVEL_BITS[1] | LEVEL_BITS[2]
+    return levels
+
+
+class _NumberTable:
+    """Tags and level validity of every split of one number"""
+
+    __slots__ = ("tags", "levels")
+
+    def __init__(self, number):
+        self.tags = bytearray(split_tags(number, left) for left in range(number + 1))
+        self.levels = bytearray(split_levels(number, left) for left in range(number + 1))
+
+
+class _Candidates:
+    """Left values matching a filter, with each value's position for O(1) exclusion"""
+
+    __slots__ = ("lefts", "positions")
+
+    def __init__(self, lefts, number):
+        self.lefts = array("H", lefts)
+        self.positions = array("i", [-1]) * (number + 1)
+        for index, left in enumerate(self.lefts):
+            self.positions[left] = index
+
+
+class DecompositionIndex:
+    """Shared index of all decompositions, built lazily per number and cached"""
+
+    def __init__(self, numbers=()):
+        self._tables = {}
+        self._candidates = {}
+        self.precompute(numbers)
+
+    def precompute(self, numbers):
+        """Build the tables for the given numbers up front"""
+        for number in numbers:
+            self._table(number)
+
+    def _table(self, number):
+        table = self._tables.get(number)
+        if table is None:
+            if not 0 <= number <= MAX_PART:
+                raise ValueError(f"Number out of range: {number}")
+            table = self._tables[number] = _NumberTable(number)
+        return table
+
+    def tags(self, number, left):
+        """Return the difficulty tags of a split"""
+        table = self._table(number)
+        if not 0 <= left <= number:
+            raise ValueError(f"Left part out of range for {number}: {left}")
+        return table.tags[left]
+
+    def difficulty(self, number, left):
+        """Return the difficulty class name of a split"""
+        tags = self.tags(number, left)
+        for tag in DIFFICULTY_ORDER:
+            if tags & tag:
+                return TAG_NAMES[tag]
+        return "other"
+
+    def is_valid(self, number, level, left):
+        """Return True if the level may ask for this split"""
+        return 0 <= left <= number and bool(self._table(number).levels[left] & LEVEL_BITS[level])
+
+    def candidates(self, number, level, include=0, exclude=0):
+        """Return the left values valid for a level, filtered by tags
+
+        include: every one of these tags must be set
+        exclude: none of these tags may be set
+        """
+        return self._get_candidates(number, level, include, exclude).lefts
+
+    def _get_candidates(self, number, level, include, exclude):
+        key = (number, level, include, exclude)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            table = self._table(number)
+            level_bit = LEVEL_BITS[level]
+            lefts = [
+                left for left in range(number + 1)
+                if table.levels[left] & level_bit
+                and table.tags[left] & include == include
+                and not table.tags[left] & exclude
+            ]
+            candidates = self._candidates[key] = _Candidates(lefts, number)
+        return candidates
+
+    def sample(self, number, level, rng, include=0, exclude=0, avoid=None):
+        """Pick a random valid split's left value, different from avoid when possible"""
+        candidates = self._get_candidates(number, level, include, exclude)
+        count = len(candidates.lefts)
+        if count == 0:
+            raise ValueError(f"No decomposition of {number} for level {level} matches the filter")
+
+        avoid_index = candidates.positions[avoid] if avoid is not None and 0 <= avoid <= number else -1
+        if avoid_index < 0 or count == 1:
+            return candidates.lefts[rng.randrange(count)]
+
+        # Draw from the other count-1 values, skipping over the avoided one
+        index = rng.randrange(count - 1)
+        if index >= avoid_index:
+            index += 1
+        return candidates.lefts[index]
+
+
+# Global decomposition index shared by all levels
+_decomposition_index = None
+
+
+def get_decomposition_index():
+    """Get the shared decomposition index (numbers 4-10 are built up front)"""
+    global _decomposition_index
+    if _decomposition_index is None:
+        _decomposition_index = DecompositionIndex(range(4, 11))
+    return _decomposition_index
@@ -0,0 +1,21 @@
+"""
+Keyboard focus for the level entries
+Seats opened as windows on one X display share a single keyboard focus, so a
+level must not pull the focus away from the seat another child is typing in.
+"""
+
+
+def claim_focus(widget):
+    """Focus widget, unless the focus is in another window of this app (e.g. another seat)
+
+    When the app doesn't have the focus at all, Tk only remembers widget as its
+    window's focus, which is what the next click or window switch restores.
+    """
+    try:
+        focused = widget.focus_get()
+    except KeyError:
+        # Focus is in a widget tkinter doesn't know (e.g. a menu); leave it there
+        return
+    if focused is not None and focused.winfo_toplevel() != widget.winfo_toplevel():
+        return
+    widget.focus_set()
@@ -7,37 +7,62 @@ Child enters both numbers.
 
 import tkinter as tk
 from tkinter import Canvas
-import random
 import math
 import sys
 import os
+import time
 
 # Import audio manager
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from animation import Animation, get_animator, pulse
 from audio_manager import get_audio_manager
+from dot_sprites import get_dot_backend
+from levels.focus import claim_focus
+from levels.logic import FEEDBACK_DELAY, Level1Logic
+from metrics import get_metrics
+from records import record_answer
+from session import get_session_recorder
+from styles import get_font
+from ui_state import StateStore
+
+DOT_RADIUS = 20
 
 
 class Level1(tk.Frame):
     def __init__(self, parent, number):
         super().__init__(parent, bg="white")
-        self.number = number
-        self.divider_position = 0
+        self.logic = Level1Logic(number)
+        self.recorder = get_session_recorder(self)
+        self.recorder.record("start", 1, number, self.logic.seed)
+        self.ui_state = StateStore(self, number=number, feedback=("", "#333"))
+        self.feedback_ids = set()
+        self.dot_items = []
+        self.dot_xs = []
+        self.divider_item = None
 
         # Create UI elements
         self.create_widgets()
         self.randomize_divider()
 
+    @property
+    def number(self):
+        return self.logic.number
+
+    @property
+    def exercise(self):
+        return self.logic.exercise
+
     def create_widgets(self):
         """Create all UI components for Level 1"""
         # Number display at top
         self.number_label = tk.Label(
             self,
-            text=str(self.number),
-            font=("Arial", 48, "bold"),
+            font=get_font(self, "title"),
             bg="white",
             fg="#333"
         )
         self.number_label.pack(pady=(20, 10))
+        self.ui_state.bind(self.number_label, "number", lambda value: {"text": str(value)})
 
         # Canvas for dots and divider
         self.canvas = Canvas(
@@ -57,7 +82,7 @@ class Level1(tk.Frame):
         self.left_entry = tk.Entry(
             input_frame,
             width=5,
-            font=("Arial", 36),
+            font=get_font(self, "entry"),
             justify="center",
             bd=2,
             relief="solid"
@@ -68,7 +93,7 @@ class Level1(tk.Frame):
         plus_label = tk.Label(
             input_frame,
             text="+",
-            font=("Arial", 36),
+            font=get_font(self, "entry"),
             bg="white"
         )
         plus_label.pack(side="left", padx=10)
@@ -77,7 +102,7 @@ class Level1(tk.Frame):
         self.right_entry = tk.Entry(
             input_frame,
             width=5,
-            font=("Arial", 36),
+            font=get_font(self, "entry"),
             justify="center",
             bd=2,
             relief="solid"
@@ -91,151 +116,200 @@ class Level1(tk.Frame):
         self.right_entry.bind("<Return>", self.check_answer)
 
         # Set focus to left entry
-        self.left_entry.focus_set()
+        claim_focus(self.left_entry)
 
         # Feedback label (hidden initially)
         self.feedback_label = tk.Label(
             self,
             text="",
-            font=("Arial", 24),
+            font=get_font(self, "feedback"),
             bg="white"
         )
         self.feedback_label.pack(pady=10)
+        self.ui_state.bind(
+            self.feedback_label, "feedback",
+            lambda value: {"text": value[0], "fg": value[1]}
+        )
 
     def draw_dots(self):
+        """Redraw the dots and record how long it took"""
+        start = time.perf_counter()
+        self.render_dots()
+        get_metrics().histogram(
+            "redraw_seconds", "Time to redraw a dot canvas", ("level",)
+        ).observe(time.perf_counter() - start, level=1)
+
+    def render_dots(self):
         """Draw dots horizontally with divider line and grouping by fives"""
+        get_animator(self).cancel(self, "divider")
         self.canvas.delete("all")
 
-        dot_radius = 20
         spacing_x = 50  # Regular spacing between dots
         gap_after_five = 30  # Extra gap after 5th dot
 
         # Calculate total width including the gap
         total_width = (self.number * spacing_x) + (gap_after_five if self.number > 5 else 0)
         start_x = (600 - total_width) / 2 + spacing_x / 2
-        y = 125  # Center vertically
+        y = self.dot_y = 125  # Center vertically
 
         # Draw dots horizontally
-        dot_positions = []
+        self.dot_items = []
+        self.dot_xs = []
         for i in range(self.number):
             # Add extra gap after the 5th dot
             x_offset = gap_after_five if i >= 5 else 0
             x = start_x + (i * spacing_x) + x_offset
 
             # Determine if dot is on left or right of divider
-            color = "#4CAF50" if i < self.divider_position else "#2196F3"
-
-            self.canvas.create_oval(
-                x - dot_radius, y - dot_radius,
-                x + dot_radius, y + dot_radius,
-                fill=color,
-                outline="#333",
-                width=2
-            )
-            dot_positions.append((x, y))
-
-        # Draw divider line between dots
-        if 0 < self.divider_position < self.number:
-            left_idx = self.divider_position - 1
-            right_idx = self.divider_position
-
-            # Calculate positions with gap consideration
-            left_x_offset = gap_after_five if left_idx >= 5 else 0
-            right_x_offset = gap_after_five if right_idx >= 5 else 0
+            color = "#4CAF50" if i < self.exercise.left else "#2196F3"
 
-            left_x = start_x + (left_idx * spacing_x) + left_x_offset
-            right_x = start_x + (right_idx * spacing_x) + right_x_offset
-            divider_x = (left_x + right_x) / 2
+            item = get_dot_backend().draw(self.canvas, x, y, DOT_RADIUS, color)
+            self.dot_items.append(item)
+            self.dot_xs.append(x)
 
-            self.canvas.create_line(
+        # Draw divider line between dots
+        self.divider_item = None
+        if 0 < self.exercise.left < self.number:
+            divider_x = self.divider_x(self.exercise.left)
+            self.divider_item = self.canvas.create_line(
                 divider_x, y - 40,
                 divider_x, y + 40,
                 fill="#FF5722",
                 width=4
             )
 
-    def randomize_divider(self):
-        """Randomly place the divider between dots, ensuring it's different from previous"""
-        # Divider can be at positions 1 to number-1 (not at 0 or number)
-        if self.number > 2:
-            # If there are multiple possible positions, ensure we get a different one
-            new_position = self.divider_position
-            while new_position == self.divider_position:
-                new_position = random.randint(1, self.number - 1)
-            self.divider_position = new_position
-        else:
-            # For number=2, there's only one position, so just set it
-            self.divider_position = 1
+    def divider_x(self, position):
+        """Return the x coordinate of the divider between dot position-1 and position"""
+        return (self.dot_xs[position - 1] + self.dot_xs[position]) / 2
+
+    def slide_divider(self, old_position):
+        """Animate the divider sliding from its old position, recoloring the dots it passes"""
+        if self.divider_item is None or not 0 < old_position < self.number:
+            return
+
+        old_x = self.divider_x(old_position)
+        new_x = self.divider_x(self.exercise.left)
+        backend = get_dot_backend()
+        colors = {}
+
+        def step(t):
+            x = old_x + (new_x - old_x) * t
+            self.canvas.coords(self.divider_item, x, self.dot_y - 40, x, self.dot_y + 40)
+            for item, dot_x in zip(self.dot_items, self.dot_xs):
+                color = "#4CAF50" if dot_x < x else "#2196F3"
+                if colors.get(item) != color:
+                    backend.recolor(self.canvas, item, DOT_RADIUS, color)
+                    colors[item] = color
+
+        get_animator(self).start(self, "divider", Animation(0.3, step))
+
+    def randomize_divider(self, animate=False):
+        """Pick a new divider position (different from the previous one) and redraw"""
+        old_number, old_position = self.number, self.exercise.left
+        self.logic.new_exercise()
+        self.ui_state.set(number=self.number)
         self.draw_dots()
+        # Exercises from a compiled batch may switch to another number; don't slide then
+        if animate and self.number == old_number:
+            self.slide_divider(old_position)
+
+    def load_exercises(self, exercises):
+        """Practice a compiled batch of exercises (see levels.compiler)"""
+        self.logic.load_exercises(exercises)
+        self.recorder.record("exercises", getattr(exercises, "spec", None))
+        self.clear_inputs()
+        self.randomize_divider()
+        claim_focus(self.left_entry)
 
     def on_key_release(self, event):
         """Handle keyboard input to move between boxes and auto-check"""
         widget = event.widget
-        content = widget.get()
+        field = "left" if widget == self.left_entry else "right"
+        self.recorder.record("key", field, widget.get())
 
-        # Only allow digits
-        if content and not content.isdigit():
+        # Only digits are kept, the left box is limited to 2 digits
+        content, auto_check = self.logic.key(field, widget.get())
+        if content != widget.get():
             widget.delete(0, tk.END)
-            return
+            widget.insert(0, content)
 
         # If left box has content and we're in left box, move to right box
         if widget == self.left_entry and content:
-            if len(content) > 2:  # Limit to 2 digits
-                widget.delete(2, tk.END)
-            self.right_entry.focus_set()
+            claim_focus(self.right_entry)
 
         # Auto-check when both boxes have values
-        if self.left_entry.get() and self.right_entry.get():
+        if auto_check:
             self.check_answer()
 
     def check_answer(self, event=None):
         """Check if the answer is correct"""
-        try:
-            left_val = int(self.left_entry.get()) if self.left_entry.get() else None
-            right_val = int(self.right_entry.get()) if self.right_entry.get() else None
-
-            if left_val is None or right_val is None:
-                return
-
-            # Check if answer is correct
-            if left_val + right_val == self.number and left_val == self.divider_position:
-                self.show_feedback("Correct! ✓", "#4CAF50")
-                get_audio_manager().play_correct()
-                self.after(500, self.on_correct)
-            else:
-                self.show_feedback("Try again", "#FF5722")
-                get_audio_manager().play_wrong()
-                self.after(500, self.on_wrong)
-
-        except ValueError:
-            pass
+        if event is not None:
+            self.recorder.record("return")
+
+        answer = self.logic.check()
+        if answer is None:
+            return
+        record_answer(answer)
+        self.recorder.record("answer", answer.given_left, answer.given_right, answer.correct)
+
+        if answer.correct:
+            self.show_feedback("Correct! ✓", "#4CAF50")
+            get_audio_manager().play_correct()
+            get_animator(self).start(self, "pulse", pulse(self.number_label, "fg", "#333333", "#4CAF50"))
+            self.schedule_feedback(self.on_correct)
+        else:
+            self.show_feedback("Try again", "#FF5722")
+            get_audio_manager().play_wrong()
+            self.schedule_feedback(self.on_wrong)
+
+    def schedule_feedback(self, callback):
+        """Run callback once the feedback delay has passed"""
+        def run():
+            self.feedback_ids.discard(after_id)
+            callback()
+
+        after_id = self.after(int(FEEDBACK_DELAY * 1000), run)
+        self.feedback_ids.add(after_id)
 
     def show_feedback(self, message, color):
         """Display feedback message"""
-        self.feedback_label.config(text=message, fg=color)
+        self.ui_state.set(feedback=(message, color))
 
     def on_correct(self):
         """Handle correct answer"""
-        self.feedback_label.config(text="")
+        self.recorder.record("feedback")
+        self.ui_state.set(feedback=("", "#333"))
         self.clear_inputs()
-        self.randomize_divider()
-        self.left_entry.focus_set()
+        self.randomize_divider(animate=True)
+        claim_focus(self.left_entry)
 
     def on_wrong(self):
         """Handle wrong answer"""
-        self.feedback_label.config(text="")
+        self.recorder.record("feedback")
+        self.ui_state.set(feedback=("", "#333"))
         self.clear_inputs()
-        self.left_entry.focus_set()
+        claim_focus(self.left_entry)
 
     def clear_inputs(self):
         """Clear both input boxes"""
+        self.logic.clear_inputs()
         self.left_entry.delete(0, tk.END)
         self.right_entry.delete(0, tk.END)
 
     def set_number(self, number):
         """Update the number being practiced"""
-        self.number = number
-        self.number_label.config(text=str(number))
+        self.recorder.record("number", number)
+        self.ui_state.set(number=number)
         self.clear_inputs()
-        self.randomize_divider()
-        self.left_entry.focus_set()
+        self.logic.set_number(number)
+        self.draw_dots()
+        claim_focus(self.left_entry)
+
+    def destroy(self):
+        """Cancel pending callbacks and UI updates before destroying the widget"""
+        for after_id in self.feedback_ids:
+            self.after_cancel(after_id)
+        self.feedback_ids.clear()
+        self.ui_state.cancel()
+        get_animator(self).cancel_all(self)
+        super().destroy()
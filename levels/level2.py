@@ -7,38 +7,61 @@ Child must calculate the missing portion mentally.
 
 import tkinter as tk
 from tkinter import Canvas
-import random
 import math
 import sys
 import os
+import time
 
 # Import audio manager
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from animation import Animation, blend, get_animator, pulse
 from audio_manager import get_audio_manager
+from dot_sprites import get_dot_backend
+from levels.focus import claim_focus
+from levels.logic import FEEDBACK_DELAY, Level2Logic
+from metrics import get_metrics
+from records import record_answer
+from session import get_session_recorder
+from styles import get_font
+from ui_state import StateStore
+
+DOT_RADIUS = 20
+REVEAL_STEPS = 16
 
 
 class Level2(tk.Frame):
     def __init__(self, parent, number):
         super().__init__(parent, bg="white")
-        self.number = number
-        self.visible_dots = 0
-        self.hidden_dots = 0
+        self.logic = Level2Logic(number)
+        self.recorder = get_session_recorder(self)
+        self.recorder.record("start", 2, number, self.logic.seed)
+        self.ui_state = StateStore(self, number=number, feedback=("", "#333"))
+        self.feedback_ids = set()
+        self.dot_xs = []
 
         # Create UI elements
         self.create_widgets()
         self.randomize_dots()
 
+    @property
+    def number(self):
+        return self.logic.number
+
+    @property
+    def exercise(self):
+        return self.logic.exercise
+
     def create_widgets(self):
         """Create all UI components for Level 2"""
         # Number display at top
         self.number_label = tk.Label(
             self,
-            text=str(self.number),
-            font=("Arial", 48, "bold"),
+            font=get_font(self, "title"),
             bg="white",
             fg="#333"
         )
         self.number_label.pack(pady=(20, 10))
+        self.ui_state.bind(self.number_label, "number", lambda value: {"text": str(value)})
 
         # Canvas for dots
         self.canvas = Canvas(
@@ -54,11 +77,11 @@ class Level2(tk.Frame):
         input_frame = tk.Frame(self, bg="white")
         input_frame.pack(pady=20)
 
-        # Left input box (pre-filled with visible dots count)
+        # Left input box (pre-filled with visible dots count, unless the first part is missing)
         self.left_entry = tk.Entry(
             input_frame,
             width=5,
-            font=("Arial", 36),
+            font=get_font(self, "entry"),
             justify="center",
             bd=2,
             relief="solid",
@@ -72,7 +95,7 @@ class Level2(tk.Frame):
         plus_label = tk.Label(
             input_frame,
             text="+",
-            font=("Arial", 36),
+            font=get_font(self, "entry"),
             bg="white"
         )
         plus_label.pack(side="left", padx=10)
@@ -81,156 +104,219 @@ class Level2(tk.Frame):
         self.right_entry = tk.Entry(
             input_frame,
             width=5,
-            font=("Arial", 36),
+            font=get_font(self, "entry"),
             justify="center",
             bd=2,
-            relief="solid"
+            relief="solid",
+            readonlybackground="white",
+            fg="#333"
         )
         self.right_entry.pack(side="left", padx=10)
+        self.ui_state.bind_given("given", self.entries)
 
-        # Bind keyboard events (only for right entry)
-        self.right_entry.bind("<KeyRelease>", self.on_key_release)
-        self.right_entry.bind("<Return>", self.check_answer)
+        # Bind keyboard events (keys in the pre-filled entry are ignored)
+        for entry in (self.left_entry, self.right_entry):
+            entry.bind("<KeyRelease>", self.on_key_release)
+            entry.bind("<Return>", self.check_answer)
 
         # Set focus to right entry since left is pre-filled
-        self.right_entry.focus_set()
+        claim_focus(self.right_entry)
 
         # Feedback label (hidden initially)
         self.feedback_label = tk.Label(
             self,
             text="",
-            font=("Arial", 24),
+            font=get_font(self, "feedback"),
             bg="white"
         )
         self.feedback_label.pack(pady=10)
+        self.ui_state.bind(
+            self.feedback_label, "feedback",
+            lambda value: {"text": value[0], "fg": value[1]}
+        )
 
     def draw_dots(self):
+        """Redraw the dots and record how long it took"""
+        start = time.perf_counter()
+        self.render_dots()
+        get_metrics().histogram(
+            "redraw_seconds", "Time to redraw a dot canvas", ("level",)
+        ).observe(time.perf_counter() - start, level=2)
+
+    def render_dots(self):
         """Draw only visible dots horizontally with grouping by fives (hidden dots not drawn)"""
+        get_animator(self).cancel(self, "reveal")
         self.canvas.delete("all")
 
-        dot_radius = 20
         spacing_x = 50  # Regular spacing between dots
         gap_after_five = 30  # Extra gap after 5th dot
 
         # Calculate total width including the gap
         total_width = (self.number * spacing_x) + (gap_after_five if self.number > 5 else 0)
         start_x = (600 - total_width) / 2 + spacing_x / 2
-        y = 125  # Center vertically
+        y = self.dot_y = 125  # Center vertically
 
-        # Show only the leftmost visible dots
-        visible_indices = set(range(self.visible_dots))
+        # Show only the leftmost visible dots (the rightmost ones if the first part is missing)
+        if self.exercise.unknown == "left":
+            visible_indices = set(range(self.exercise.left, self.number))
+        else:
+            visible_indices = set(range(self.exercise.left))
 
         # Draw only visible dots horizontally
+        self.dot_xs = []
         for i in range(self.number):
-            if i in visible_indices:
-                # Add extra gap after the 5th dot
-                x_offset = gap_after_five if i >= 5 else 0
-                x = start_x + (i * spacing_x) + x_offset
+            # Add extra gap after the 5th dot
+            x_offset = gap_after_five if i >= 5 else 0
+            x = start_x + (i * spacing_x) + x_offset
+            self.dot_xs.append(x)
 
+            if i in visible_indices:
                 # Draw visible dot
-                self.canvas.create_oval(
-                    x - dot_radius, y - dot_radius,
-                    x + dot_radius, y + dot_radius,
-                    fill="#4CAF50",
-                    outline="#333",
-                    width=2
-                )
-
-    def randomize_dots(self):
-        """Randomly decide how many dots are visible vs hidden, ensuring different from previous"""
-        # Show between 1 and (number-1) dots
-        # This ensures there's always something hidden and something visible
-        if self.number > 2:
-            # If there are multiple possible values, ensure we get a different one
-            new_visible = self.visible_dots
-            while new_visible == self.visible_dots:
-                new_visible = random.randint(1, self.number - 1)
-            self.visible_dots = new_visible
-        elif self.number == 2:
-            # For number=2, toggle between 1 and 1 (only one option, so it will repeat)
-            # Actually for 2, we can only show 1 dot, so we can't avoid repetition
-            self.visible_dots = 1
+                get_dot_backend().draw(self.canvas, x, y, DOT_RADIUS, "#4CAF50")
+
+    def reveal_hidden_dots(self):
+        """Fade in the hidden dots after a correct answer"""
+        backend = get_dot_backend()
+        y = self.dot_y
+        if self.exercise.unknown == "left":
+            hidden_xs = self.dot_xs[:self.exercise.left]
         else:
-            self.visible_dots = 1
+            hidden_xs = self.dot_xs[self.exercise.left:]
+        for x in hidden_xs:
+            backend.draw(self.canvas, x, y, DOT_RADIUS, "#FFFFFF", outline="#FFFFFF", tags="revealed")
+
+        def step(t):
+            # A fixed number of fade steps keeps the sprite backend's cache small
+            t = round(t * REVEAL_STEPS) / REVEAL_STEPS
+            backend.recolor(
+                self.canvas, "revealed", DOT_RADIUS,
+                blend("#FFFFFF", "#2196F3", t),
+                outline=blend("#FFFFFF", "#333333", t)
+            )
+
+        get_animator(self).start(self, "reveal", Animation(0.4, step))
 
-        self.hidden_dots = self.number - self.visible_dots
+    def randomize_dots(self):
+        """Pick how many dots are visible (different from the previous exercise) and redraw"""
+        # Between 1 and number-1 dots are shown, so there's always something hidden
+        self.logic.new_exercise()
+        self.ui_state.set(number=self.number)
         self.draw_dots()
 
-        # Pre-fill the left entry with the visible dots count
-        self.update_left_entry()
+        # Pre-fill the given entry with the visible dots count
+        self.update_given_entry()
+
+    def load_exercises(self, exercises):
+        """Practice a compiled batch of exercises (see levels.compiler)"""
+        self.logic.load_exercises(exercises)
+        self.recorder.record("exercises", getattr(exercises, "spec", None))
+        self.clear_inputs()
+        self.randomize_dots()
+        claim_focus(self.answer_entry())
 
-    def update_left_entry(self):
-        """Update the left entry with the visible dots count"""
-        # Temporarily enable the entry to update its value
-        self.left_entry.config(state="normal")
-        self.left_entry.delete(0, tk.END)
-        self.left_entry.insert(0, str(self.visible_dots))
-        self.left_entry.config(state="readonly")
+    def entries(self, unknown):
+        """Return the (given, answer) entries for the part the child has to find"""
+        if unknown == "left":
+            return self.right_entry, self.left_entry
+        return self.left_entry, self.right_entry
+
+    def answer_entry(self):
+        """Return the entry the child types into"""
+        return self.entries(self.exercise.unknown)[1]
+
+    def update_given_entry(self):
+        """Update the given entry with the visible dots count"""
+        _, _, given = self.logic.display()
+        self.ui_state.set(given=(self.exercise.unknown, given))
 
     def on_key_release(self, event):
         """Handle keyboard input and auto-check"""
         widget = event.widget
-        content = widget.get()
-
-        # Only allow digits
-        if content and not content.isdigit():
-            widget.delete(0, tk.END)
+        field = "left" if widget == self.left_entry else "right"
+        if field != self.exercise.unknown:
             return
+        self.recorder.record("key", field, widget.get())
 
-        # Limit to 2 digits
-        if len(content) > 2:
-            widget.delete(2, tk.END)
+        # Only digits are kept, limited to 2 digits
+        content, auto_check = self.logic.key(field, widget.get())
+        if content != widget.get():
+            widget.delete(0, tk.END)
+            widget.insert(0, content)
 
-        # Auto-check when right box has a value (left is pre-filled)
-        if self.right_entry.get():
+        # Auto-check when the answer box has a value (the other one is pre-filled)
+        if auto_check:
             self.check_answer()
 
     def check_answer(self, event=None):
         """Check if the answer is correct"""
-        try:
-            right_val = int(self.right_entry.get()) if self.right_entry.get() else None
+        if event is not None:
+            self.recorder.record("return")
 
-            if right_val is None:
-                return
+        answer = self.logic.check()
+        if answer is None:
+            return
+        record_answer(answer)
+        self.recorder.record("answer", answer.given_left, answer.given_right, answer.correct)
+
+        if answer.correct:
+            self.show_feedback("Correct! ✓", "#4CAF50")
+            get_audio_manager().play_correct()
+            self.reveal_hidden_dots()
+            get_animator(self).start(self, "pulse", pulse(self.number_label, "fg", "#333333", "#4CAF50"))
+            self.schedule_feedback(self.on_correct)
+        else:
+            self.show_feedback("Try again", "#FF5722")
+            get_audio_manager().play_wrong()
+            self.schedule_feedback(self.on_wrong)
 
-            # Check if the answer is correct (left is pre-filled with visible_dots)
-            if right_val == self.hidden_dots:
-                self.show_feedback("Correct! ✓", "#4CAF50")
-                get_audio_manager().play_correct()
-                self.after(500, self.on_correct)
-            else:
-                self.show_feedback("Try again", "#FF5722")
-                get_audio_manager().play_wrong()
-                self.after(500, self.on_wrong)
+    def schedule_feedback(self, callback):
+        """Run callback once the feedback delay has passed"""
+        def run():
+            self.feedback_ids.discard(after_id)
+            callback()
 
-        except ValueError:
-            pass
+        after_id = self.after(int(FEEDBACK_DELAY * 1000), run)
+        self.feedback_ids.add(after_id)
 
     def show_feedback(self, message, color):
         """Display feedback message"""
-        self.feedback_label.config(text=message, fg=color)
+        self.ui_state.set(feedback=(message, color))
 
     def on_correct(self):
         """Handle correct answer"""
-        self.feedback_label.config(text="")
+        self.recorder.record("feedback")
+        self.ui_state.set(feedback=("", "#333"))
         self.clear_inputs()
         self.randomize_dots()
-        self.right_entry.focus_set()
+        claim_focus(self.answer_entry())
 
     def on_wrong(self):
         """Handle wrong answer"""
-        self.feedback_label.config(text="")
+        self.recorder.record("feedback")
+        self.ui_state.set(feedback=("", "#333"))
         self.clear_inputs()
-        self.right_entry.focus_set()
+        claim_focus(self.answer_entry())
 
     def clear_inputs(self):
-        """Clear only the right input box (left is pre-filled)"""
-        self.right_entry.delete(0, tk.END)
+        """Clear only the answer box (the other one is pre-filled)"""
+        self.logic.clear_inputs()
+        self.answer_entry().delete(0, tk.END)
 
     def set_number(self, number):
         """Update the number being practiced"""
-        self.number = number
-        self.number_label.config(text=str(number))
+        self.recorder.record("number", number)
+        self.ui_state.set(number=number)
         self.clear_inputs()
-        self.randomize_dots()
-        self.right_entry.focus_set()
+        self.logic.set_number(number)
+        self.draw_dots()
+        self.update_given_entry()
+        claim_focus(self.answer_entry())
+
+    def destroy(self):
+        """Cancel pending callbacks and UI updates before destroying the widget"""
+        for after_id in self.feedback_ids:
+            self.after_cancel(after_id)
+        self.feedback_ids.clear()
+        self.ui_state.cancel()
+        get_animator(self).cancel_all(self)
+        super().destroy()
@@ -4,56 +4,81 @@ Shows only the number with pre-filled left value, child calculates the right val
 """
 
 import tkinter as tk
-import random
 import sys
 import os
 
 # Import audio manager
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from animation import get_animator, pulse
 from audio_manager import get_audio_manager
+from levels.focus import claim_focus
+from levels.logic import FEEDBACK_DELAY, Level3Logic
+from records import FAMILY_SUBTRACTION, record_answer
+from session import get_session_recorder
+from styles import get_font
+from ui_state import StateStore
+
+# Instruction shown above the boxes, per exercise family
+INSTRUCTIONS = {
+    "split": "Split into:",
+    "missing_first": "Split into:",
+    "three_part": "Split into:",
+    FAMILY_SUBTRACTION: "Take away:",
+}
 
 
 class Level3(tk.Frame):
     def __init__(self, parent, number):
         super().__init__(parent, bg="white")
-        self.number = number
-        self.left_value = 0
+        self.logic = Level3Logic(number)
+        self.recorder = get_session_recorder(self)
+        self.recorder.record("start", 3, number, self.logic.seed)
+        self.ui_state = StateStore(self, number=number, title=str(number), feedback=("", "#333"))
+        self.feedback_ids = set()
 
         # Create UI elements
         self.create_widgets()
         self.generate_exercise()
 
+    @property
+    def number(self):
+        return self.logic.number
+
+    @property
+    def exercise(self):
+        return self.logic.exercise
+
     def create_widgets(self):
         """Create all UI components for Level 3"""
         # Number display at top
         self.number_label = tk.Label(
             self,
-            text=str(self.number),
-            font=("Arial", 64, "bold"),
+            font=get_font(self, "title_large"),
             bg="white",
             fg="#333"
         )
         self.number_label.pack(pady=(60, 40))
+        self.ui_state.bind(self.number_label, "title", lambda value: {"text": value})
 
         # Instruction text
         instruction_label = tk.Label(
             self,
-            text="Split into:",
-            font=("Arial", 20),
+            font=get_font(self, "instruction"),
             bg="white",
             fg="#666"
         )
         instruction_label.pack(pady=(0, 30))
+        self.ui_state.bind(instruction_label, "instruction", lambda value: {"text": value})
 
         # Input frame
         input_frame = tk.Frame(self, bg="white")
         input_frame.pack(pady=20)
 
-        # Left input box (pre-filled, read-only)
+        # Left input box (pre-filled and read-only, unless the first part is missing)
         self.left_entry = tk.Entry(
             input_frame,
             width=5,
-            font=("Arial", 48),
+            font=get_font(self, "entry_large"),
             justify="center",
             bd=2,
             relief="solid",
@@ -63,123 +88,160 @@ class Level3(tk.Frame):
         )
         self.left_entry.pack(side="left", padx=10)
 
-        # Plus sign
+        # Plus sign (or the sign of the exercise family)
         plus_label = tk.Label(
             input_frame,
-            text="+",
-            font=("Arial", 48),
+            font=get_font(self, "entry_large"),
             bg="white"
         )
         plus_label.pack(side="left", padx=10)
+        self.ui_state.bind(plus_label, "sign", lambda value: {"text": value})
 
         # Right input box (user input)
         self.right_entry = tk.Entry(
             input_frame,
             width=5,
-            font=("Arial", 48),
+            font=get_font(self, "entry_large"),
             justify="center",
             bd=2,
-            relief="solid"
+            relief="solid",
+            readonlybackground="#E8F5E9",
+            fg="#333"
         )
         self.right_entry.pack(side="left", padx=10)
+        self.ui_state.bind_given("given", self.entries)
 
         # Bind keyboard events
-        self.right_entry.bind("<KeyRelease>", self.on_key_release)
-        self.right_entry.bind("<Return>", self.check_answer)
+        for entry in (self.left_entry, self.right_entry):
+            entry.bind("<KeyRelease>", self.on_key_release)
+            entry.bind("<Return>", self.check_answer)
 
         # Set focus to right entry
-        self.right_entry.focus_set()
+        claim_focus(self.right_entry)
 
         # Feedback label (hidden initially)
         self.feedback_label = tk.Label(
             self,
             text="",
-            font=("Arial", 24),
+            font=get_font(self, "feedback"),
             bg="white"
         )
         self.feedback_label.pack(pady=20)
+        self.ui_state.bind(
+            self.feedback_label, "feedback",
+            lambda value: {"text": value[0], "fg": value[1]}
+        )
+
+    def entries(self, unknown):
+        """Return the (given, answer) entries for the part the child has to find"""
+        if unknown == "left":
+            return self.right_entry, self.left_entry
+        return self.left_entry, self.right_entry
 
     def generate_exercise(self):
         """Generate a new exercise with random left value, ensuring it's different from previous"""
-        # Random value from 0 to number, but different from previous
-        if self.number > 0:
-            # If there are multiple possible values, ensure we get a different one
-            new_value = self.left_value
-            while new_value == self.left_value:
-                new_value = random.randint(0, self.number)
-            self.left_value = new_value
-        else:
-            # For number=0, there's only one option
-            self.left_value = 0
+        self.logic.new_exercise()
+        self.show_exercise()
+
+    def show_exercise(self):
+        """Display the current exercise and clear the answer box"""
+        title, sign, given = self.logic.display()
+        self.ui_state.set(
+            number=self.number,
+            title=title,
+            sign=sign,
+            instruction=INSTRUCTIONS[self.exercise.family],
+            given=(self.exercise.unknown, given)
+        )
 
-        # Update left entry
-        self.left_entry.config(state="normal")
-        self.left_entry.delete(0, tk.END)
-        self.left_entry.insert(0, str(self.left_value))
-        self.left_entry.config(state="readonly")
+        # Clear the answer entry
+        answer_entry = self.entries(self.exercise.unknown)[1]
+        answer_entry.delete(0, tk.END)
+        claim_focus(answer_entry)
 
-        # Clear right entry
-        self.right_entry.delete(0, tk.END)
-        self.right_entry.focus_set()
+    def load_exercises(self, exercises):
+        """Practice a compiled batch of exercises (see levels.compiler)"""
+        self.logic.load_exercises(exercises)
+        self.recorder.record("exercises", getattr(exercises, "spec", None))
+        self.generate_exercise()
 
     def on_key_release(self, event):
         """Handle keyboard input"""
-        content = self.right_entry.get()
-
-        # Only allow digits
-        if content and not content.isdigit():
-            self.right_entry.delete(0, tk.END)
+        field = "left" if event.widget == self.left_entry else "right"
+        if field != self.exercise.unknown:
             return
+        self.recorder.record("key", field, event.widget.get())
 
-        # Limit to 2 digits
-        if len(content) > 2:
-            self.right_entry.delete(2, tk.END)
-            return
+        # Only digits are kept, limited to 2 digits
+        content, auto_check = self.logic.key(field, event.widget.get())
+        if content != event.widget.get():
+            event.widget.delete(0, tk.END)
+            event.widget.insert(0, content)
 
         # Auto-check when user enters a value
-        if content:
+        if auto_check:
             self.check_answer()
 
     def check_answer(self, event=None):
         """Check if the answer is correct"""
-        try:
-            right_val = int(self.right_entry.get()) if self.right_entry.get() else None
+        if event is not None:
+            self.recorder.record("return")
 
-            if right_val is None:
-                return
-
-            expected_value = self.number - self.left_value
+        answer = self.logic.check()
+        if answer is None:
+            return
+        record_answer(answer)
+        self.recorder.record("answer", answer.given_left, answer.given_right, answer.correct)
+
+        if answer.correct:
+            self.show_feedback("Correct! ✓", "#4CAF50")
+            get_audio_manager().play_correct()
+            get_animator(self).start(self, "pulse", pulse(self.number_label, "fg", "#333333", "#4CAF50"))
+            self.schedule_feedback(self.on_correct)
+        else:
+            self.show_feedback("Try again", "#FF5722")
+            get_audio_manager().play_wrong()
+            self.schedule_feedback(self.on_wrong)
 
-            # Check if answer is correct
-            if right_val == expected_value:
-                self.show_feedback("Correct! ✓", "#4CAF50")
-                get_audio_manager().play_correct()
-                self.after(500, self.on_correct)
-            else:
-                self.show_feedback("Try again", "#FF5722")
-                get_audio_manager().play_wrong()
-                self.after(500, self.on_wrong)
+    def schedule_feedback(self, callback):
+        """Run callback once the feedback delay has passed"""
+        def run():
+            self.feedback_ids.discard(after_id)
+            callback()
 
-        except ValueError:
-            pass
+        after_id = self.after(int(FEEDBACK_DELAY * 1000), run)
+        self.feedback_ids.add(after_id)
 
     def show_feedback(self, message, color):
         """Display feedback message"""
-        self.feedback_label.config(text=message, fg=color)
+        self.ui_state.set(feedback=(message, color))
 
     def on_correct(self):
         """Handle correct answer - generate new exercise"""
-        self.feedback_label.config(text="")
+        self.recorder.record("feedback")
+        self.ui_state.set(feedback=("", "#333"))
         self.generate_exercise()
 
     def on_wrong(self):
-        """Handle wrong answer - clear right box only"""
-        self.feedback_label.config(text="")
-        self.right_entry.delete(0, tk.END)
-        self.right_entry.focus_set()
+        """Handle wrong answer - clear the answer box only"""
+        self.recorder.record("feedback")
+        self.ui_state.set(feedback=("", "#333"))
+        self.logic.clear_inputs()
+        answer_entry = self.entries(self.exercise.unknown)[1]
+        answer_entry.delete(0, tk.END)
+        claim_focus(answer_entry)
 
     def set_number(self, number):
         """Update the number being practiced"""
-        self.number = number
-        self.number_label.config(text=str(number))
-        self.generate_exercise()
+        self.recorder.record("number", number)
+        self.logic.set_number(number)
+        self.show_exercise()
+
+    def destroy(self):
+        """Cancel pending callbacks and UI updates before destroying the widget"""
+        for after_id in self.feedback_ids:
+            self.after_cancel(after_id)
+        self.feedback_ids.clear()
+        self.ui_state.cancel()
+        get_animator(self).cancel_all(self)
+        super().destroy()
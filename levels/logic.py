@@ -0,0 +1,211 @@
+"""
+Headless level logic
+Exercise generation, input rules and grading for the three levels, without
+any Tk dependency. The level widgets delegate to these classes, and the
+session replayer drives them directly.
+"""
+
+import random
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from levels.decompositions import get_decomposition_index
+from records import (
+    Answer, Exercise, FAMILY_MISSING_FIRST, FAMILY_SPLIT, FAMILY_SUBTRACTION, FAMILY_THREE_PART
+)
+
+# Delay between checking an answer and showing the next exercise (seconds)
+FEEDBACK_DELAY = 0.5
+
+MAX_DIGITS = 2
+
+# Numbers the levels can show (the sidebar's choices); larger ones don't fit the dot canvases
+NUMBERS = range(4, 11)
+
+# Title above the boxes and the sign between them, per exercise family
+FAMILY_DISPLAY = {
+    FAMILY_SPLIT: ("{number}", "+"),
+    FAMILY_MISSING_FIRST: ("{number}", "+"),
+    FAMILY_SUBTRACTION: ("{number} −", "="),
+    FAMILY_THREE_PART: ("{number}", "+"),
+}
+
+
+class LevelLogic:
+    """Shared logic; subclasses define the input rules
+
+    The valid splits of each level come from the shared decomposition index.
+    include_tags/exclude_tags restrict exercises to difficulty classes (see
+    levels.decompositions).
+    """
+
+    level = None
+
+    # Exercise families this level can show
+    families = (FAMILY_SPLIT, FAMILY_MISSING_FIRST)
+
+    def __init__(self, number, seed=None, clock=time.monotonic, include_tags=0, exclude_tags=0):
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.clock = clock
+        self.number = number
+        self.include_tags = include_tags
+        self.exclude_tags = exclude_tags
+        self.decompositions = get_decomposition_index()
+        self.inputs = {"left": "", "right": ""}
+        self.exercise = Exercise(self.level, number, 0, shown_at=clock())
+        self.exercise_source = None
+
+    def load_exercises(self, exercises):
+        """Take the next exercises from a compiled batch instead of sampling
+
+        Random exercises for the current number resume when the batch runs out.
+        """
+        families = getattr(exercises, "families", None)
+        if families is None:
+            exercises = list(exercises)
+            families = {exercise.family for exercise in exercises}
+        for family in families:
+            if family not in self.families:
+                raise ValueError(f"Level {self.level} cannot show {family} exercises")
+        self.exercise_source = iter(exercises)
+
+    def new_exercise(self):
+        """Pick a new split, different from the previous one when possible"""
+        if self.exercise_source is not None:
+            exercise = next(self.exercise_source, None)
+            if exercise is not None:
+                exercise.level = self.level
+                exercise.shown_at = self.clock()
+                self.number = exercise.number
+                self.exercise = exercise
+                self.clear_inputs()
+                return exercise
+            self.exercise_source = None
+
+        new_left = self.decompositions.sample(
+            self.number, self.level, self.rng,
+            include=self.include_tags, exclude=self.exclude_tags, avoid=self.exercise.left
+        )
+        self.exercise = Exercise(self.level, self.number, new_left, shown_at=self.clock())
+        self.clear_inputs()
+        return self.exercise
+
+    def set_number(self, number):
+        """Switch to another number and pick a new exercise"""
+        self.number = number
+        self.exercise_source = None
+        self.new_exercise()
+
+    def display(self):
+        """Return the title, the sign between the boxes and the text of the given part"""
+        exercise = self.exercise
+        title, sign = FAMILY_DISPLAY[exercise.family]
+        if exercise.family == FAMILY_THREE_PART:
+            given = f"{exercise.first} + {exercise.left - exercise.first}"
+        elif exercise.unknown == "left":
+            given = str(exercise.right)
+        else:
+            given = str(exercise.left)
+        return title.format(number=exercise.number), sign, given
+
+    def clear_inputs(self):
+        """Clear the fields the child types into"""
+        self.inputs["left"] = ""
+        self.inputs["right"] = ""
+
+    def key(self, field, content):
+        """Apply the input rules to an entry's content after a key press
+
+        Stores the filtered content and returns it together with whether the
+        answer should be checked right away.
+        """
+        raise NotImplementedError
+
+    def typed(self, field):
+        """Return the number typed into a field, or None if it is empty"""
+        return int(self.inputs[field]) if self.inputs[field] else None
+
+    def given_parts(self):
+        """Return the (left, right) of the current answer; the known part comes from the exercise"""
+        if self.exercise.unknown == "left":
+            return self.typed("left"), self.exercise.right
+        return self.exercise.left, self.typed("right")
+
+    def check(self):
+        """Grade the current inputs; returns an Answer, or None if incomplete"""
+        try:
+            given_left, given_right = self.given_parts()
+        except ValueError:
+            return None
+        if given_left is None or given_right is None:
+            return None
+
+        correct = given_left == self.exercise.left and given_right == self.exercise.right
+        return Answer.for_exercise(self.exercise, given_left, given_right, correct, now=self.clock())
+
+    def feedback_done(self, correct):
+        """Called when the feedback delay after an answer has passed"""
+        if correct:
+            self.new_exercise()
+        else:
+            self.clear_inputs()
+
+
+class Level1Logic(LevelLogic):
+    """Divider between dots; the child enters both parts"""
+
+    level = 1
+
+    def given_parts(self):
+        # Both parts are typed, whichever part the exercise treats as unknown
+        return self.typed("left"), self.typed("right")
+
+    def key(self, field, content):
+        if content and not content.isdigit():
+            content = ""
+        elif len(content) > MAX_DIGITS:
+            content = content[:MAX_DIGITS]
+        self.inputs[field] = content
+        return content, bool(content and self.inputs["left"] and self.inputs["right"])
+
+
+class Level2Logic(LevelLogic):
+    """Only the left dots are shown; the child enters the hidden part"""
+
+    level = 2
+
+    def key(self, field, content):
+        if content and not content.isdigit():
+            self.inputs[field] = ""
+            return "", False
+        content = content[:MAX_DIGITS]
+        self.inputs[field] = content
+        return content, bool(self.inputs[self.exercise.unknown])
+
+
+class Level3Logic(LevelLogic):
+    """Left part given as a number; the child enters the right part"""
+
+    level = 3
+    families = (FAMILY_SPLIT, FAMILY_MISSING_FIRST, FAMILY_SUBTRACTION, FAMILY_THREE_PART)
+
+    def key(self, field, content):
+        if content and not content.isdigit():
+            self.inputs[field] = ""
+            return "", False
+        if len(content) > MAX_DIGITS:
+            content = content[:MAX_DIGITS]
+            self.inputs[field] = content
+            return content, False
+        self.inputs[field] = content
+        return content, bool(content)
+
+
+LOGIC_CLASSES = {
+    1: Level1Logic,
+    2: Level2Logic,
+    3: Level3Logic,
+}
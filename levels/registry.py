@@ -0,0 +1,119 @@
+"""
+Level registry
+Maps level ids to "module:Class" specs and imports a level module only the
+first time that level is selected. Additional levels can be shipped by third
+parties through the "math_learning_tool.levels" entry point group or listed
+in a levels.json config file next to app.py.
+"""
+
+import importlib
+import json
+import os
+
+try:
+    from importlib import metadata
+except ImportError:  # Python 3.7
+    metadata = None
+
+ENTRY_POINT_GROUP = "math_learning_tool.levels"
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "levels.json")
+
+BUILTIN_LEVELS = {
+    1: "levels.level1:Level1",
+    2: "levels.level2:Level2",
+    3: "levels.level3:Level3",
+}
+
+
+class LevelRegistry:
+    """Registry of level classes, imported lazily on first use"""
+
+    def __init__(self):
+        self._specs = {}
+        self._classes = {}
+
+    def register(self, level_id, spec):
+        """Register a level by id; spec is "module:Class" or a class object"""
+        level_id = int(level_id)
+        self._specs[level_id] = spec
+        self._classes.pop(level_id, None)
+
+    def ids(self):
+        """Return all registered level ids in display order"""
+        return sorted(self._specs)
+
+    def get(self, level_id):
+        """Return the level class, importing its module on first access"""
+        level_class = self._classes.get(level_id)
+        if level_class is None:
+            spec = self._specs[level_id]
+            if isinstance(spec, str):
+                module_name, _, class_name = spec.partition(":")
+                module = importlib.import_module(module_name)
+                level_class = getattr(module, class_name)
+            else:
+                level_class = spec
+            self._classes[level_id] = level_class
+        return level_class
+
+    def load_entry_points(self, group=ENTRY_POINT_GROUP):
+        """Register levels advertised by installed packages (without importing them)"""
+        if metadata is None:
+            return
+
+        entry_points = metadata.entry_points()
+        if hasattr(entry_points, "select"):
+            entry_points = entry_points.select(group=group)
+        else:
+            entry_points = entry_points.get(group, [])
+
+        for entry_point in entry_points:
+            try:
+                self.register(entry_point.name, entry_point.value)
+            except ValueError:
+                print(f"Warning: Ignoring level entry point with non-numeric name: {entry_point.name}")
+
+    def load_config(self, path=CONFIG_FILE):
+        """Register levels listed in a JSON config file, if it exists
+
+        Format: {"levels": {"4": "my_levels.level4:Level4"}}
+        """
+        if not os.path.exists(path):
+            return
+
+        try:
+            with open(path, encoding="utf-8") as config_file:
+                config = json.load(config_file)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read level config {path}: {e}")
+            return
+
+        levels = config.get("levels", {}) if isinstance(config, dict) else None
+        if not isinstance(levels, dict):
+            print(f"Warning: Ignoring level config {path}: expected {{\"levels\": {{id: \"module:Class\"}}}}")
+            return
+
+        for level_id, spec in levels.items():
+            if not isinstance(spec, str):
+                print(f"Warning: Ignoring level {level_id} in {path}: expected \"module:Class\"")
+                continue
+            try:
+                self.register(level_id, spec)
+            except ValueError:
+                print(f"Warning: Ignoring level with non-numeric id in {path}: {level_id}")
+
+
+# Global level registry instance
+_level_registry = None
+
+
+def get_level_registry():
+    """Get the global level registry, discovering levels on first call"""
+    global _level_registry
+    if _level_registry is None:
+        _level_registry = LevelRegistry()
+        for level_id, spec in BUILTIN_LEVELS.items():
+            _level_registry.register(level_id, spec)
+        _level_registry.load_entry_points()
+        _level_registry.load_config()
+    return _level_registry
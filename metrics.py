@@ -0,0 +1,237 @@
+"""
+In-process metrics registry
+Counters, gauges and fixed-bucket histograms that the app, the levels and the
+audio manager report into. The registry can be exported periodically to a
+Prometheus text file for a node exporter's textfile collector.
+
+Each metric is only written from one thread (normally the Tk main thread), so
+updates are plain dict operations without locks.
+"""
+
+import os
+import time
+from bisect import bisect_left
+
+PREFIX = "mathtool_"
+
+# Default histogram buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    """Format a Prometheus label set"""
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class for a named metric with optional labels"""
+
+    type_name = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        """Return the metric in Prometheus text format"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets"""
+
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            # Per-bucket counts (last one is +Inf), sum, count
+            series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, **labels):
+        series = self._values.get(self._key(labels))
+        return series[2] if series else 0
+
+    def samples(self):
+        for key, (bucket_counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    """Collection of metrics, looked up or created by name"""
+
+    def __init__(self, prefix=PREFIX):
+        self.prefix = prefix
+        self._metrics = {}
+
+    def _get_or_create(self, metric_class, name, documentation, labelnames, **kwargs):
+        full_name = self.prefix + name
+        metric = self._metrics.get(full_name)
+        if metric is None:
+            metric = self._metrics[full_name] = metric_class(full_name, documentation, labelnames, **kwargs)
+        elif not isinstance(metric, metric_class):
+            raise ValueError(f"Metric {full_name} already registered as {metric.type_name}")
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """Return all metrics in Prometheus text format"""
+        return "\n".join(metric.render() for _, metric in sorted(self._metrics.items())) + "\n"
+
+
+class TextfileExporter:
+    """Periodically writes a registry to a Prometheus text file"""
+
+    def __init__(self, registry, path, interval=15.0):
+        self.registry = registry
+        self.path = path
+        self.interval_ms = int(interval * 1000)
+        self._root = None
+        self._after_id = None
+
+    def start(self, root):
+        """Start exporting from the Tk event loop"""
+        self._root = root
+        self._schedule()
+
+    def stop(self):
+        """Stop exporting and write a final snapshot"""
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+        self.write()
+
+    def _schedule(self):
+        self._after_id = self._root.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        self.write()
+        self._schedule()
+
+    def write(self):
+        """Write the registry atomically so the scraper never sees a partial file"""
+        self.registry.gauge("last_export_timestamp_seconds", "Time of the last metrics export").set(time.time())
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as metrics_file:
+                metrics_file.write(self.registry.render())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write metrics to {self.path}: {e}")
+
+
+class EventLoopLagMonitor:
+    """Measures how late Tk runs a periodic after() callback"""
+
+    def __init__(self, registry, interval=0.5):
+        self.interval = interval
+        self.lag = registry.histogram("event_loop_lag_seconds", "Delay of scheduled Tk callbacks")
+        self._root = None
+        self._after_id = None
+        self._expected = 0.0
+
+    def start(self, root):
+        self._root = root
+        self._schedule()
+
+    def stop(self):
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _schedule(self):
+        self._expected = time.perf_counter() + self.interval
+        self._after_id = self._root.after(int(self.interval * 1000), self._tick)
+
+    def _tick(self):
+        self.lag.observe(max(time.perf_counter() - self._expected, 0.0))
+        self._schedule()
+
+
+# Global metrics registry instance
+_metrics = None
+
+
+def get_metrics():
+    """Get the global metrics registry"""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+    return _metrics
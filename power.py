@@ -0,0 +1,107 @@
+"""
+Idle power saving
+After a period without keyboard or mouse input the app goes idle: periodic
+timers are cancelled, the audio device is released and animations stop, so
+the event loop sleeps until the next input. The next keypress restores the
+timers and the UI at once; slow work such as reopening the audio device
+should be deferred with root.after(0, ...), off the input path.
+
+Entering idle records how many Tk timers are still pending (each is a
+wakeup); resuming records how long the restore took and the CPU time used
+while idle.
+"""
+
+import time
+
+from metrics import get_metrics
+
+DEFAULT_IDLE_TIMEOUT = 300.0  # seconds without input
+
+
+class IdleManager:
+    """Pauses registered components after a period without input"""
+
+    def __init__(self, root, timeout=DEFAULT_IDLE_TIMEOUT):
+        self.root = root
+        self.timeout = timeout
+        self.idle = False
+        self._participants = []  # (pause, resume)
+        self._last_input = time.monotonic()
+        self._after_id = None
+        self._idle_since = None
+        self._idle_cpu = None
+
+        metrics = get_metrics()
+        self.idle_metric = metrics.counter("idle_entries_total", "Times the app went idle")
+        self.idle_seconds_metric = metrics.counter("idle_seconds_total", "Time spent idle")
+        self.idle_cpu_metric = metrics.counter("idle_cpu_seconds_total", "CPU time used while idle")
+        self.pending_timers_metric = metrics.gauge(
+            "idle_pending_timers", "Tk timers still pending when the app went idle"
+        )
+        self.resume_metric = metrics.histogram(
+            "idle_resume_seconds", "Time from the first input to a restored UI",
+            buckets=(0.001, 0.0025, 0.005, 0.01, 0.016, 0.025, 0.05, 0.1)
+        )
+
+    def add(self, pause, resume=None):
+        """Register a component: pause() runs when going idle, resume() on the next input"""
+        self._participants.append((pause, resume))
+
+    def start(self):
+        """Watch for input (call once the widgets exist)"""
+        for sequence in ("<KeyPress>", "<ButtonPress>"):
+            self.root.bind_all(sequence, self.on_input, add="+")
+        self._schedule(self.timeout)
+
+    def stop(self):
+        """Stop the idle timer"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _schedule(self, delay):
+        self._after_id = self.root.after(max(int(delay * 1000), 1), self._check)
+
+    def on_input(self, event=None):
+        """Note input; wakes the app up if it is idle"""
+        # Only a timestamp per key; the idle timer is not rescheduled for every input
+        self._last_input = time.monotonic()
+        if self.idle:
+            self.resume()
+
+    def _check(self):
+        self._after_id = None
+        remaining = self.timeout - (time.monotonic() - self._last_input)
+        if remaining > 0:
+            self._schedule(remaining)
+        else:
+            self.enter_idle()
+
+    def enter_idle(self):
+        """Pause every registered component"""
+        if self.idle:
+            return
+        self.stop()
+        self.idle = True
+        self.idle_metric.inc()
+        for pause, _ in self._participants:
+            pause()
+        self.pending_timers_metric.set(len(self.root.tk.splitlist(self.root.tk.call("after", "info"))))
+        self._idle_since = time.monotonic()
+        self._idle_cpu = time.process_time()
+
+    def resume(self):
+        """Resume every registered component and restore the UI"""
+        if not self.idle:
+            return
+        start = time.perf_counter()
+        self.idle_seconds_metric.inc(time.monotonic() - self._idle_since)
+        self.idle_cpu_metric.inc(time.process_time() - self._idle_cpu)
+        self.idle = False
+
+        for _, resume in reversed(self._participants):
+            if resume is not None:
+                resume()
+        self.root.update_idletasks()
+        self.resume_metric.observe(time.perf_counter() - start)
+        self._schedule(self.timeout)
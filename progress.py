@@ -0,0 +1,136 @@
+"""
+Binary progress export and import
+A student's answer history is written as a versioned, fixed-width binary
+file, so it can be moved between kiosks and backed up cheaply:
+
+    header   magic "MLTP", version, record size, record count, block size,
+             block count, student name length
+    name     student name (UTF-8)
+    index    per block: file offset, record count, first and last timestamp
+    records  16 bytes per answer, in blocks of BLOCK_SIZE records
+
+Import streams one block at a time, so memory stays bounded however large
+the file is, and the index lets it skip blocks older than a given time.
+"""
+
+import os
+import struct
+
+from item_stats import get_item_stats
+from records import FLAG_CORRECT, AnswerHistory, get_answer_history
+
+MAGIC = b"MLTP"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<4sHHIIIH")
+INDEX_ENTRY = struct.Struct("<QIII")
+# Same columns and order as AnswerHistory.COLUMNS
+RECORD = struct.Struct("<" + "".join(typecode for _, typecode in AnswerHistory.COLUMNS))
+
+BLOCK_SIZE = 4096  # records per block
+
+
+class ProgressFileError(ValueError):
+    """The file is not a progress export this version can read"""
+
+
+def export_progress(path, history=None, student=""):
+    """Write an answer history to path; returns the number of answers written"""
+    history = get_answer_history() if history is None else history
+    count = len(history)
+    name = student.encode("utf-8")
+    block_count = (count + BLOCK_SIZE - 1) // BLOCK_SIZE
+    data_start = HEADER.size + len(name) + block_count * INDEX_ENTRY.size
+    timestamps = history.column("timestamp")
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as export_file:
+        export_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size, count, BLOCK_SIZE, block_count, len(name)))
+        export_file.write(name)
+        for block in range(block_count):
+            start = block * BLOCK_SIZE
+            stop = min(start + BLOCK_SIZE, count)
+            block_timestamps = timestamps[start:stop]
+            export_file.write(INDEX_ENTRY.pack(
+                data_start + start * RECORD.size, stop - start,
+                min(block_timestamps), max(block_timestamps)
+            ))
+
+        buffer = bytearray(BLOCK_SIZE * RECORD.size)
+        for block in range(block_count):
+            start = block * BLOCK_SIZE
+            stop = min(start + BLOCK_SIZE, count)
+            for offset, row in enumerate(history.rows(start, stop)):
+                RECORD.pack_into(buffer, offset * RECORD.size, *row)
+            export_file.write(memoryview(buffer)[:(stop - start) * RECORD.size])
+    os.replace(tmp_path, path)
+    return count
+
+
+class ProgressReader:
+    """Reads a progress export block by block"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._read_header()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _read_header(self):
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ProgressFileError(f"{self.path}: truncated header")
+        magic, version, record_size, count, _, block_count, name_length = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ProgressFileError(f"{self.path}: not a progress export")
+        if version != FORMAT_VERSION or record_size != RECORD.size:
+            raise ProgressFileError(f"{self.path}: unsupported format version {version}")
+        self.count = count
+        self.student = self._file.read(name_length).decode("utf-8")
+        index = self._file.read(block_count * INDEX_ENTRY.size)
+        if len(index) < block_count * INDEX_ENTRY.size:
+            raise ProgressFileError(f"{self.path}: truncated index")
+        # (offset, count, first timestamp, last timestamp) per block
+        self.blocks = list(INDEX_ENTRY.iter_unpack(index))
+
+    def rows(self, since=None):
+        """Yield raw records in AnswerHistory column order, skipping blocks older than since"""
+        for offset, count, _, last_timestamp in self.blocks:
+            if since is not None and last_timestamp < since:
+                continue
+            self._file.seek(offset)
+            data = self._file.read(count * RECORD.size)
+            if len(data) < count * RECORD.size:
+                raise ProgressFileError(f"{self.path}: truncated block at offset {offset}")
+            for row in RECORD.iter_unpack(data):
+                if since is None or row[-1] >= since:
+                    yield row
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def import_progress(path, history=None, stats=None, since=None):
+    """Append the answers of a progress export to a history and item statistics
+
+    Returns (student, number of answers imported).
+    """
+    history = get_answer_history() if history is None else history
+    stats = get_item_stats() if stats is None else stats
+    imported = 0
+    with ProgressReader(path) as reader:
+        for row in reader.rows(since):
+            history.append_row(row)
+            level, number, left, _, _, flags, response_ms, _ = row
+            stats.update_item(level, number, left, bool(flags & FLAG_CORRECT), response_ms)
+            imported += 1
+        return reader.student, imported
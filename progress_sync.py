@@ -0,0 +1,224 @@
+"""
+Progress replication through a shared folder
+Every device appends its own answers to an append-only delta file in a
+shared (local or NFS) folder and merges the other devices' deltas into its
+answer history. Devices only ever write their own file, so merging is
+conflict-free; answers are immutable and each is merged exactly once.
+
+    <folder>/<student>/<device>.delta               16-byte records after a small header
+    <folder>/<student>/<device>.checkpoint-N.mltp   merged history of N answers (progress export)
+    <folder>/<student>/<device>.checkpoint.json     current snapshot and the delta offsets in it
+
+At startup the checkpoint is loaded and only the delta bytes appended since
+are read, instead of every device's full history.
+"""
+
+import glob
+import json
+import os
+import socket
+import struct
+
+from item_stats import ItemStats, get_item_stats
+from progress import RECORD, ProgressFileError, export_progress, import_progress
+from records import (FLAG_CORRECT, AnswerHistory, add_answer_listener, get_answer_history,
+                     remove_answer_listener)
+
+DELTA_MAGIC = b"MLTD"
+DELTA_VERSION = 1
+DELTA_HEADER = struct.Struct("<4sHH")
+
+DELTA_SUFFIX = ".delta"
+CHECKPOINT_SUFFIX = ".checkpoint"
+
+DEFAULT_STUDENT = "default"
+
+# Answers added to the history between periodic checkpoints
+CHECKPOINT_EVERY = 1000
+
+
+def read_delta(path, offset=0):
+    """Read the complete records appended to a delta file after offset
+
+    Returns (rows, new offset), with rows in AnswerHistory column order.
+    """
+    with open(path, "rb") as delta_file:
+        if offset == 0:
+            header = delta_file.read(DELTA_HEADER.size)
+            if len(header) < DELTA_HEADER.size:
+                return [], 0  # still being created
+            magic, version, record_size = DELTA_HEADER.unpack(header)
+            if magic != DELTA_MAGIC or version != DELTA_VERSION or record_size != RECORD.size:
+                raise ProgressFileError(f"{path}: unsupported delta format")
+            offset = DELTA_HEADER.size
+        delta_file.seek(offset)
+        data = delta_file.read()
+
+    # A writer may be in the middle of a record; leave it for the next read
+    data = data[:len(data) - len(data) % RECORD.size]
+    return list(RECORD.iter_unpack(data)), offset + len(data)
+
+
+class ProgressSync:
+    """Appends this device's answers to the shared folder and merges the others'"""
+
+    def __init__(self, folder, device=None, student="", history=None, stats=None, interval=30.0):
+        self.device = device or socket.gethostname()
+        self.directory = os.path.join(folder, student or DEFAULT_STUDENT)
+        self.history = get_answer_history() if history is None else history
+        self.stats = get_item_stats() if stats is None else stats
+        self.interval_ms = int(interval * 1000)
+        self.delta_path = os.path.join(self.directory, self.device + DELTA_SUFFIX)
+        self.checkpoint_path = os.path.join(self.directory, self.device + CHECKPOINT_SUFFIX)
+        # Bytes of each device's delta already merged into the history
+        self.offsets = {}
+        # History length covered by the last checkpoint
+        self._checkpointed = 0
+        self._pending = []
+        self._root = None
+        self._after_id = None
+
+    def start(self, root=None):
+        """Load the checkpoint, merge what changed since, and record new answers"""
+        os.makedirs(self.directory, exist_ok=True)
+        self.load_checkpoint()
+        self.merge()
+        add_answer_listener(self.add_answer)
+        if root is not None:
+            self._root = root
+            self._schedule()
+
+    def stop(self):
+        """Write pending answers, merge once more and save a checkpoint"""
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+        remove_answer_listener(self.add_answer)
+        self.sync()
+        if len(self.history) != self._checkpointed:
+            self.save_checkpoint()
+
+    def pause(self):
+        """Stop the periodic sync after syncing once (the app is idle, nothing new to write)"""
+        if self._after_id is None:
+            return
+        self._root.after_cancel(self._after_id)
+        self._after_id = None
+        try:
+            self.sync()
+            self.checkpoint_if_due(1)
+        except OSError as e:
+            print(f"Warning: Could not sync progress: {e}")
+
+    def resume(self):
+        """Restart the periodic sync"""
+        if self._root is not None and self._after_id is None:
+            self._schedule()
+
+    def _schedule(self):
+        self._after_id = self._root.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        try:
+            self.sync()
+            self.checkpoint_if_due()
+        except OSError as e:
+            # The shared folder may be temporarily unavailable; retry next time
+            print(f"Warning: Could not sync progress: {e}")
+        self._schedule()
+
+    def add_answer(self, answer):
+        """Queue an answer of this device for the next flush"""
+        self._pending.append(RECORD.pack(
+            answer.level, answer.number, answer.left, answer.given_left, answer.given_right,
+            FLAG_CORRECT if answer.correct else 0, answer.response_ms, answer.timestamp
+        ))
+
+    def sync(self):
+        """Flush this device's answers and merge the other devices' new ones"""
+        self.flush()
+        return self.merge()
+
+    def flush(self):
+        """Append queued answers to this device's delta file"""
+        if not self._pending:
+            return
+        with open(self.delta_path, "ab") as delta_file:
+            if delta_file.tell() == 0:
+                delta_file.write(DELTA_HEADER.pack(DELTA_MAGIC, DELTA_VERSION, RECORD.size))
+            delta_file.write(b"".join(self._pending))
+            # Our own answers are already in the history
+            self.offsets[self.device] = delta_file.tell()
+        self._pending = []
+
+    def merge(self):
+        """Merge the records appended to every delta file since the last merge; returns how many"""
+        merged = 0
+        for path in sorted(glob.glob(os.path.join(self.directory, "*" + DELTA_SUFFIX))):
+            device = os.path.basename(path)[:-len(DELTA_SUFFIX)]
+            merged += self._merge_delta(device, path)
+        return merged
+
+    def _merge_delta(self, device, path):
+        try:
+            rows, self.offsets[device] = read_delta(path, self.offsets.get(device, 0))
+        except ProgressFileError as e:
+            print(f"Warning: Skipping {e}")
+            return 0
+        self._merge_rows(rows)
+        return len(rows)
+
+    def _merge_rows(self, rows):
+        for row in rows:
+            self.history.append_row(row)
+            level, number, left, _, _, flags, response_ms, _ = row
+            self.stats.update_item(level, number, left, bool(flags & FLAG_CORRECT), response_ms)
+
+    def load_checkpoint(self):
+        """Load the merged history and offsets saved by save_checkpoint"""
+        # Read the whole snapshot before merging it, so a broken one leaves the history untouched
+        snapshot = AnswerHistory()
+        try:
+            with open(self.checkpoint_path + ".json", encoding="utf-8") as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+            import_progress(os.path.join(self.directory, checkpoint["snapshot"]), snapshot, ItemStats())
+            offsets = dict(checkpoint["offsets"])
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError, ProgressFileError) as e:
+            # Fall back to merging every delta from the start
+            print(f"Warning: Ignoring progress checkpoint: {e}")
+            return False
+        self._merge_rows(snapshot.rows())
+        self.offsets = offsets
+        self._checkpointed = len(self.history)
+        return True
+
+    def checkpoint_if_due(self, every=CHECKPOINT_EVERY):
+        """Save a checkpoint once enough answers were added since the last one
+
+        Without it, a device that is killed instead of stopped would read
+        every delta from the start again.
+        """
+        if len(self.history) - self._checkpointed >= every:
+            self.save_checkpoint()
+
+    def save_checkpoint(self):
+        """Save the merged history together with the delta offsets it covers"""
+        self.flush()
+        snapshot = f"{self.device}{CHECKPOINT_SUFFIX}-{len(self.history)}.mltp"
+        export_progress(os.path.join(self.directory, snapshot), self.history,
+                        student=os.path.basename(self.directory))
+
+        # Switching to the new snapshot is a single atomic rename, so a crash
+        # leaves either the old or the new snapshot with matching offsets
+        tmp_path = f"{self.checkpoint_path}.json.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump({"snapshot": snapshot, "offsets": self.offsets}, checkpoint_file)
+        os.replace(tmp_path, self.checkpoint_path + ".json")
+
+        self._checkpointed = len(self.history)
+
+        for path in glob.glob(os.path.join(self.directory, f"{self.device}{CHECKPOINT_SUFFIX}-*.mltp")):
+            if os.path.basename(path) != snapshot:
+                os.remove(path)
@@ -0,0 +1,196 @@
+"""
+Compact exercise and answer records
+Exercises and answers use __slots__ classes; the answer history stores each
+answer as one row of packed arrays (16 bytes per answer) instead of a dict.
+"""
+
+import time
+from array import array
+
+from item_stats import get_item_stats
+
+# Longest response time stored (in ms); slower answers are clamped
+MAX_RESPONSE_MS = 0xFFFF
+
+FLAG_CORRECT = 0x01
+
+# Exercise families
+FAMILY_SPLIT = "split"                  # number = left + ?
+FAMILY_SUBTRACTION = "subtraction"      # number - left = ?
+FAMILY_MISSING_FIRST = "missing_first"  # number = ? + right
+FAMILY_THREE_PART = "three_part"        # number = first + (left - first) + ?
+FAMILIES = (FAMILY_SPLIT, FAMILY_SUBTRACTION, FAMILY_MISSING_FIRST, FAMILY_THREE_PART)
+
+
+class Exercise:
+    """A number split into left + right for one level
+
+    For three-part splits, left is the sum of the first two parts and first
+    is the first part.
+    """
+
+    __slots__ = ("level", "number", "left", "right", "shown_at", "family", "first")
+
+    def __init__(self, level, number, left, shown_at=None, family=FAMILY_SPLIT, first=0):
+        self.level = level
+        self.number = number
+        self.left = left
+        self.right = number - left
+        self.shown_at = time.monotonic() if shown_at is None else shown_at
+        self.family = family
+        self.first = first
+
+    @property
+    def unknown(self):
+        """Which part the child has to find ("left" or "right")"""
+        return "left" if self.family == FAMILY_MISSING_FIRST else "right"
+
+    def __repr__(self):
+        if self.family == FAMILY_SPLIT:
+            return f"Exercise(level={self.level}, number={self.number}, left={self.left})"
+        return (f"Exercise(level={self.level}, number={self.number}, left={self.left}, "
+                f"family={self.family!r}, first={self.first})")
+
+
+class Answer:
+    """A single answer given for an exercise"""
+
+    __slots__ = ("level", "number", "left", "given_left", "given_right",
+                 "correct", "response_ms", "timestamp")
+
+    def __init__(self, level, number, left, given_left, given_right,
+                 correct, response_ms, timestamp):
+        self.level = level
+        self.number = number
+        self.left = left
+        self.given_left = given_left
+        self.given_right = given_right
+        self.correct = correct
+        self.response_ms = response_ms
+        self.timestamp = timestamp
+
+    @classmethod
+    def for_exercise(cls, exercise, given_left, given_right, correct, now=None):
+        """Create an answer for an exercise, timed from when it was shown"""
+        now = time.monotonic() if now is None else now
+        response_ms = int((now - exercise.shown_at) * 1000)
+        return cls(
+            exercise.level, exercise.number, exercise.left,
+            given_left, given_right, correct,
+            min(max(response_ms, 0), MAX_RESPONSE_MS), int(time.time())
+        )
+
+    def __repr__(self):
+        return (f"Answer(level={self.level}, number={self.number}, left={self.left}, "
+                f"given={self.given_left}+{self.given_right}, correct={self.correct})")
+
+
+class AnswerHistory:
+    """Append-only answer history stored column-wise in packed arrays"""
+
+    # (attribute, typecode) for each column; 16 bytes per answer in total
+    COLUMNS = (
+        ("level", "B"),
+        ("number", "H"),
+        ("left", "H"),
+        ("given_left", "H"),
+        ("given_right", "H"),
+        ("flags", "B"),
+        ("response_ms", "H"),
+        ("timestamp", "I"),
+    )
+
+    # Largest value each column can hold
+    LIMITS = tuple(256 ** array(typecode).itemsize - 1 for _, typecode in COLUMNS)
+
+    def __init__(self):
+        self._columns = {name: array(typecode) for name, typecode in self.COLUMNS}
+
+    def __len__(self):
+        return len(self._columns["level"])
+
+    def append(self, answer):
+        """Store an answer"""
+        self.append_row((
+            answer.level, answer.number, answer.left, answer.given_left, answer.given_right,
+            FLAG_CORRECT if answer.correct else 0, answer.response_ms, answer.timestamp
+        ))
+
+    def __getitem__(self, index):
+        columns = self._columns
+        return Answer(
+            columns["level"][index],
+            columns["number"][index],
+            columns["left"][index],
+            columns["given_left"][index],
+            columns["given_right"][index],
+            bool(columns["flags"][index] & FLAG_CORRECT),
+            columns["response_ms"][index],
+            columns["timestamp"][index],
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append_row(self, row):
+        """Store a raw row, given in COLUMNS order (as produced by rows())
+
+        Values outside a column's range are clamped to it, all before the
+        first column grows, so the columns always keep the same length.
+        """
+        if len(row) != len(self.COLUMNS):
+            raise ValueError(f"expected {len(self.COLUMNS)} values, got {len(row)}")
+        row = [min(max(int(value), 0), limit) for value, limit in zip(row, self.LIMITS)]
+        for (name, _), value in zip(self.COLUMNS, row):
+            self._columns[name].append(value)
+
+    def rows(self, start=0, stop=None):
+        """Yield raw rows in COLUMNS order, without creating Answer objects"""
+        return zip(*(self._columns[name][start:stop] for name, _ in self.COLUMNS))
+
+    def column(self, name):
+        """Return the packed array backing a column"""
+        return self._columns[name]
+
+    def nbytes(self):
+        """Return the number of bytes used by the stored answers"""
+        return sum(len(values) * values.itemsize for values in self._columns.values())
+
+    def clear(self):
+        """Remove all answers"""
+        for name, typecode in self.COLUMNS:
+            self._columns[name] = array(typecode)
+
+
+# Global answer history instance
+_answer_history = None
+_answer_listeners = []
+
+
+def get_answer_history():
+    """Get the global answer history"""
+    global _answer_history
+    if _answer_history is None:
+        _answer_history = AnswerHistory()
+    return _answer_history
+
+
+def add_answer_listener(listener):
+    """Call listener(answer) for every recorded answer (adding it twice has no effect)"""
+    if listener not in _answer_listeners:
+        _answer_listeners.append(listener)
+
+
+def remove_answer_listener(listener):
+    """Stop calling a listener added with add_answer_listener"""
+    if listener in _answer_listeners:
+        _answer_listeners.remove(listener)
+
+
+def record_answer(answer):
+    """Store an answer in the global history and item statistics, and notify listeners"""
+    get_answer_history().append(answer)
+    get_item_stats().update(answer)
+    for listener in list(_answer_listeners):
+        listener(answer)
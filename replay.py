@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Replay recorded sessions through the headless level logic
+Sessions recorded with `app.py --record-sessions DIR` are re-run without a
+display: the same seeds produce the same exercises and the recorded
+keystrokes are fed through the same input rules and grading. Any answer that
+grades differently from the recording is reported as a divergence.
+
+Many sessions are replayed in parallel across a process pool, which also
+makes this a throughput benchmark for the grading path.
+
+Usage: python replay.py SESSION_FILE_OR_DIR... [--workers N] [--repeat N]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from levels.compiler import compile_exercises
+from levels.logic import LOGIC_CLASSES
+from session import load_session
+
+
+def replay_segment(segment):
+    """Replay one level segment; returns (answers, correct answers, divergences)"""
+    now = [0.0]
+    logic = LOGIC_CLASSES[segment["level"]](segment["number"], seed=segment["seed"], clock=lambda: now[0])
+    logic.new_exercise()
+
+    answers = []
+    recorded = []
+    pending = deque()
+
+    def grade():
+        answer = logic.check()
+        if answer is not None:
+            answers.append(answer)
+            pending.append(answer.correct)
+
+    for event in segment["events"]:
+        now[0] = event[0]
+        kind = event[1]
+        if kind == "key":
+            _, auto_check = logic.key(event[2], event[3])
+            if auto_check:
+                grade()
+        elif kind == "return":
+            grade()
+        elif kind == "feedback":
+            if pending:
+                logic.feedback_done(pending.popleft())
+        elif kind == "number":
+            logic.clear_inputs()
+            logic.set_number(event[2])
+        elif kind == "exercises" and event[2] is not None:
+            # Compiled batches record their spec, including the seed
+            logic.load_exercises(compile_exercises(event[2]))
+            logic.new_exercise()
+        elif kind == "answer":
+            recorded.append((event[2], event[3], event[4]))
+
+    replayed = [(a.given_left, a.given_right, a.correct) for a in answers]
+    divergences = sum(1 for r, p in zip(recorded, replayed) if r != p) + abs(len(recorded) - len(replayed))
+    return len(answers), sum(1 for a in answers if a.correct), divergences
+
+
+def replay_file(path):
+    """Replay every segment of a session file"""
+    totals = {"path": path, "segments": 0, "answers": 0, "correct": 0, "divergences": 0, "error": None}
+    try:
+        for segment in load_session(path):
+            answers, correct, divergences = replay_segment(segment)
+            totals["segments"] += 1
+            totals["answers"] += answers
+            totals["correct"] += correct
+            totals["divergences"] += divergences
+    except (OSError, ValueError, KeyError) as e:
+        # A missing or unreadable session fails on its own; the others still replay
+        totals["error"] = f"{type(e).__name__}: {e}"
+    return totals
+
+
+def collect_paths(paths):
+    """Expand directories into the session files they contain"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.jsonl"))))
+        else:
+            files.append(path)
+    return files
+
+
+def replay_many(paths, workers=None, chunksize=16):
+    """Replay session files across a process pool; yields per-file totals"""
+    if workers == 1:
+        yield from map(replay_file, paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(replay_file, paths, chunksize=chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded sessions without a display")
+    parser.add_argument("paths", nargs="+", help="session files or directories of session files")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--repeat", type=int, default=1, help="replay every session N times (for benchmarking)")
+    parser.add_argument("--verbose", action="store_true", help="list sessions that diverge")
+    args = parser.parse_args(argv)
+
+    files = collect_paths(args.paths) * args.repeat
+    if not files:
+        print("No session files found")
+        return 1
+
+    start = time.perf_counter()
+    sessions = answers = divergences = failed = 0
+    for totals in replay_many(files, args.workers):
+        if totals["error"]:
+            failed += 1
+            print(f"Failed: {totals['path']} ({totals['error']})")
+            continue
+        sessions += 1
+        answers += totals["answers"]
+        divergences += totals["divergences"]
+        if args.verbose and totals["divergences"]:
+            print(f"Diverged: {totals['path']} ({totals['divergences']} answers)")
+    elapsed = time.perf_counter() - start
+
+    print(f"Replayed {sessions} sessions, {answers} answers in {elapsed:.2f} s")
+    print(f"Throughput: {sessions / elapsed:.0f} sessions/s, {answers / elapsed:.0f} answers/s")
+    if failed:
+        print(f"✗ {failed} sessions could not be replayed")
+    if divergences:
+        print(f"✗ {divergences} answers graded differently than recorded")
+    if failed or divergences:
+        return 1
+    print("✓ All sessions replayed identically")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
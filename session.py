@@ -0,0 +1,120 @@
+"""
+Session recording
+Records each level's seed and the timestamped keystrokes of a session to a
+JSON-lines file, so the session can be replayed without a display (see
+replay.py).
+
+Each line is a JSON list [seconds since session start, kind, *args]:
+    start    level, number, seed     a level widget was created
+    key      field, content          entry content after a key release
+    return                           Enter pressed
+    number   number                  another number was selected
+    exercises spec                   a compiled batch was loaded (see levels.compiler)
+    feedback                         feedback delay passed (next exercise / retry)
+    answer   left, right, correct    an answer was graded
+"""
+
+import json
+import os
+import time
+
+# Bumped whenever exercise generation changes, as old seeds no longer replay
+SESSION_FORMAT = 2
+
+
+class SessionRecorder:
+    """Appends session events to a JSON-lines file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._start = time.monotonic()
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self.record("session", SESSION_FORMAT)
+
+    def record(self, kind, *args):
+        event = [round(time.monotonic() - self._start, 4), kind]
+        event.extend(args)
+        self._file.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class NullRecorder:
+    """Recorder used when recording is disabled"""
+
+    def record(self, kind, *args):
+        pass
+
+    def close(self):
+        pass
+
+
+_recorder = NullRecorder()
+_seat_recorders = {}
+
+
+def get_session_recorder(widget=None):
+    """Get the active session recorder (a no-op recorder if not recording)
+
+    In multi-seat mode every seat records into its own file; pass a widget to
+    get the recorder of the seat window it belongs to.
+    """
+    if widget is not None:
+        seat = getattr(widget.winfo_toplevel(), "seat", None)
+        if seat in _seat_recorders:
+            return _seat_recorders[seat]
+    return _recorder
+
+
+def start_recording(directory, seat=None):
+    """Start recording this session (or one seat of it) into a new file in directory"""
+    global _recorder
+    os.makedirs(directory, exist_ok=True)
+    filename = time.strftime("session-%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+    if seat is not None:
+        filename += f"-seat{seat}"
+    recorder = SessionRecorder(os.path.join(directory, filename + ".jsonl"))
+    if seat is None:
+        _recorder = recorder
+    else:
+        _seat_recorders[seat] = recorder
+    return recorder
+
+
+def stop_recording():
+    """Stop recording and close the session files"""
+    global _recorder
+    _recorder.close()
+    _recorder = NullRecorder()
+    for recorder in _seat_recorders.values():
+        recorder.close()
+    _seat_recorders.clear()
+
+
+def load_session(path):
+    """Split a session file into segments, one per level widget
+
+    Returns a list of dicts with level, number, seed and the segment's events.
+    """
+    segments = []
+    with open(path, encoding="utf-8") as session_file:
+        for line in session_file:
+            line = line.strip()
+            if not line:
+                continue
+            event = json.loads(line)
+            kind = event[1]
+            if kind == "session":
+                if event[2] != SESSION_FORMAT:
+                    raise ValueError(f"{path}: unsupported session format {event[2]}")
+            elif kind == "start":
+                segments.append({
+                    "level": event[2],
+                    "number": event[3],
+                    "seed": event[4],
+                    "events": [],
+                })
+            elif segments:
+                segments[-1]["events"].append(event)
+    return segments
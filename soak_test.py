@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Soak test for leaks across level and number switches
+Runs tens of thousands of select_level/select_number cycles (optionally
+answering an exercise before each switch, so feedback callbacks are pending)
+and samples traced Python memory, live object counts, Tcl command counts and
+pending after() callbacks. Fails if any of them keeps growing after warm-up.
+
+Requires a display (on a headless machine use e.g. `xvfb-run python soak_test.py`).
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tkinter as tk
+
+from app import MathLearningApp
+from records import get_answer_history
+
+# Allowed growth between the middle and the end of the run
+DEFAULT_TOLERANCES = {
+    "traced_kb": 256,
+    "objects": 500,
+    "tcl_commands": 20,
+    "pending_afters": 5,
+}
+
+
+def take_sample(root):
+    """Measure everything that could leak"""
+    gc.collect()
+    return {
+        "traced_kb": tracemalloc.get_traced_memory()[0] // 1024,
+        "objects": len(gc.get_objects()),
+        "tcl_commands": len(root.tk.splitlist(root.tk.call("info", "commands"))),
+        "pending_afters": len(root.tk.splitlist(root.tk.call("after", "info"))),
+    }
+
+
+def answer_current(app):
+    """Type the correct answer into the current level, leaving its feedback pending"""
+    level = app.current_level_widget
+    logic = getattr(level, "logic", None)
+    if logic is None:
+        return
+    if logic.level == 1:
+        logic.key("left", str(logic.exercise.left))
+    logic.key("right", str(logic.exercise.right))
+    level.check_answer()
+
+
+def run_cycles(root, app, rng, count, answer):
+    """Switch level and number count times"""
+    level_ids = app.level_registry.ids()
+    numbers = list(app.number_buttons)
+    for _ in range(count):
+        if answer:
+            answer_current(app)
+        app.select_level(rng.choice([l for l in level_ids if l != app.current_level]))
+        app.select_number(rng.choice([n for n in numbers if n != app.current_number]))
+        root.update()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak test for leaks across level/number switches")
+    parser.add_argument("--cycles", type=int, default=20000, help="switch cycles to run (default: 20000)")
+    parser.add_argument("--samples", type=int, default=10, help="number of measurements (default: 10)")
+    parser.add_argument("--warmup", type=int, default=500, help="cycles before the first measurement")
+    parser.add_argument("--answer", action="store_true", help="answer an exercise before every switch")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    root = tk.Tk()
+    app = MathLearningApp(root)
+    rng = random.Random(args.seed)
+
+    tracemalloc.start()
+    run_cycles(root, app, rng, args.warmup, args.answer)
+    get_answer_history().clear()
+
+    samples = [take_sample(root)]
+    per_sample = max(args.cycles // args.samples, 1)
+    print(f"{'cycle':>8}" + "".join(f"{name:>16}" for name in samples[0]))
+    print(f"{0:>8}" + "".join(f"{value:>16}" for value in samples[0].values()))
+    for index in range(1, args.samples + 1):
+        run_cycles(root, app, rng, per_sample, args.answer)
+        # The answer history grows by design; only look at the rest
+        get_answer_history().clear()
+        samples.append(take_sample(root))
+        print(f"{index * per_sample:>8}" + "".join(f"{value:>16}" for value in samples[-1].values()))
+
+    tracemalloc.stop()
+    root.destroy()
+
+    # Growth in the second half of the run means it is not levelling off
+    middle, last = samples[len(samples) // 2], samples[-1]
+    failures = [
+        f"{name} grew by {last[name] - middle[name]} (allowed {tolerance})"
+        for name, tolerance in DEFAULT_TOLERANCES.items()
+        if last[name] - middle[name] > tolerance
+    ]
+    print()
+    if failures:
+        for failure in failures:
+            print(f"✗ {failure}")
+        return 1
+    print("✓ No unbounded growth detected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Event-loop stall watchdog
+A heartbeat is posted through root.after(); a monitor thread flags any gap
+longer than the threshold and samples the main thread's stack while the
+stall lasts. Samples are written to a rotating log file.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from logging.handlers import RotatingFileHandler
+
+from metrics import get_metrics
+
+DEFAULT_LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stalls.log")
+
+
+class StallWatchdog:
+    """Detects stalls of the Tk event loop and logs where the main thread was"""
+
+    def __init__(self, root, threshold=0.25, interval=0.1, log_path=DEFAULT_LOG_FILE,
+                 max_samples=5, max_bytes=1024 * 1024, backup_count=3):
+        self.root = root
+        self.threshold = threshold
+        self.interval = interval
+        self.max_samples = max_samples
+
+        self.logger = logging.getLogger(f"mathtool.watchdog.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self._handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count,
+                                            encoding="utf-8")
+        self._handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self.logger.addHandler(self._handler)
+
+        metrics = get_metrics()
+        self.stalls_metric = metrics.counter("stalls_total", "Event-loop stalls over the watchdog threshold")
+        self.stall_seconds_metric = metrics.histogram("stall_seconds", "Duration of event-loop stalls")
+
+        self._main_thread_id = None
+        self._last_beat = time.monotonic()
+        self._stall_samples = 0  # written by the monitor thread, reset by the heartbeat
+        self._after_id = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the heartbeat and the monitor thread (call from the Tk thread)"""
+        self._main_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stall_samples = 0
+        self._stop.clear()
+        self._schedule()
+        self._thread = threading.Thread(target=self._monitor, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def pause(self):
+        """Stop the heartbeat and the monitor thread; start() resumes monitoring"""
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stop(self):
+        """Stop monitoring and close the log"""
+        self.pause()
+        self.logger.removeHandler(self._handler)
+        self._handler.close()
+
+    def _schedule(self):
+        self._after_id = self.root.after(int(self.interval * 1000), self._beat)
+
+    def _beat(self):
+        """Heartbeat, runs on the Tk thread"""
+        now = time.monotonic()
+        if self._stall_samples:
+            duration = now - self._last_beat - self.interval
+            self.stalls_metric.inc()
+            self.stall_seconds_metric.observe(duration)
+            self.logger.info("Stall ended after %.3f s", duration)
+            self._stall_samples = 0
+        self._last_beat = now
+        self._schedule()
+
+    def _monitor(self):
+        """Monitor loop, runs on the watchdog thread"""
+        poll = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(poll):
+            # The heartbeat is expected every `interval`; anything beyond that is a stall
+            late = time.monotonic() - self._last_beat - self.interval
+            if late > self.threshold * (self._stall_samples + 1) and self._stall_samples < self.max_samples:
+                self._stall_samples += 1
+                self._sample(late)
+
+    def _sample(self, late):
+        """Log the main thread's current stack"""
+        frame = sys._current_frames().get(self._main_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else "  (main thread not found)\n"
+        self.logger.info("Event loop stalled for %.3f s (sample %d), main thread stack:\n%s",
+                         late, self._stall_samples, stack.rstrip())
@@ -0,0 +1,66 @@
+"""
+Shared named fonts
+Every widget refers to a named font from this registry instead of a literal
+font tuple, so each font is created once per Tk root (not once per widget),
+and all text can be rescaled for large displays with one call per font.
+"""
+
+from tkinter import font as tkfont
+
+# name -> (family, size, weight)
+FONT_SPECS = {
+    "title_large": ("Arial", 64, "bold"),     # Level 3 number
+    "title": ("Arial", 48, "bold"),           # Level 1/2 number
+    "entry_large": ("Arial", 48, "normal"),   # Level 3 boxes and sign
+    "entry": ("Arial", 36, "normal"),         # Level 1/2 boxes and sign
+    "feedback": ("Arial", 24, "normal"),      # feedback message
+    "instruction": ("Arial", 20, "normal"),   # Level 3 instruction
+    "heading": ("Arial", 14, "bold"),         # sidebar headings
+    "button": ("Arial", 12, "normal"),        # level buttons
+    "button_small": ("Arial", 11, "normal"),  # number buttons
+    "table_heading": ("Arial", 11, "bold"),   # dashboard headings
+    "table": ("Arial", 10, "normal"),         # dashboard rows
+}
+
+
+class FontRegistry:
+    """The named fonts of one Tk root"""
+
+    def __init__(self, root, scale=1.0):
+        self.root = root
+        self.scale = scale
+        self._fonts = {}
+
+    def get(self, name):
+        """Return the named font, creating it on first use"""
+        font = self._fonts.get(name)
+        if font is None:
+            family, size, weight = FONT_SPECS[name]
+            font = self._fonts[name] = tkfont.Font(
+                root=self.root, name=f"mathtool_{name}",
+                family=family, size=self._scaled(size), weight=weight
+            )
+        return font
+
+    def _scaled(self, size):
+        return max(int(round(size * self.scale)), 1)
+
+    def rescale(self, scale):
+        """Resize every font; widgets using them update automatically"""
+        self.scale = scale
+        for name, font in self._fonts.items():
+            font.configure(size=self._scaled(FONT_SPECS[name][1]))
+
+
+def get_font_registry(widget):
+    """Get the font registry shared by all widgets of a Tk root"""
+    root = widget._root()
+    registry = getattr(root, "_font_registry", None)
+    if registry is None:
+        registry = root._font_registry = FontRegistry(root)
+    return registry
+
+
+def get_font(widget, name):
+    """Return a named font for a widget"""
+    return get_font_registry(widget).get(name)
@@ -2,9 +2,35 @@
 """
 Test script to verify the Math Learning Tool setup
 Run this to check if all dependencies are properly installed
+
+With --diagnostics it also times Tk startup, fonts, audio, the first level
+and a synthetic typing run, and compares them against thresholds (which can
+be overridden per deployment in diagnostics.json) to tell whether a machine
+is fast enough.
 """
 
+import argparse
+import json
+import os
 import sys
+import time
+from types import SimpleNamespace
+
+# Diagnostics thresholds in milliseconds; a slower measurement is a warning
+DEFAULT_THRESHOLDS = {
+    "tk_root": 500,
+    "fonts": 200,
+    "mixer_init": 500,
+    "wav_decode": 100,
+    "level_construct": 300,
+    "first_paint": 300,
+    "keystroke_p95": 50,
+}
+
+# Clips decoded for the wav_decode measurement
+DECODE_CLIPS = ("correct.wav", "wrong.wav")
+
+DEFAULT_THRESHOLDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "diagnostics.json")
 
 
 def test_python_version():
@@ -90,8 +116,175 @@ def test_imports():
         return False
 
 
+def load_thresholds(path):
+    """Return the default thresholds, overridden by a JSON file if it exists"""
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if path and os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as thresholds_file:
+                thresholds.update(json.load(thresholds_file))
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read thresholds from {path}: {e}")
+    return thresholds
+
+
+def elapsed_ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def measure_mixer():
+    """Time pygame mixer initialization and WAV decoding; returns (init ms, decode ms)
+
+    Decoding is timed on the default feedback clips only, so the result
+    doesn't grow with the size of the sound library.
+    """
+    sounds_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sounds")
+    wav_files = [path for path in (os.path.join(sounds_dir, name) for name in DECODE_CLIPS)
+                 if os.path.exists(path)]
+    try:
+        import pygame
+    except ImportError:
+        pygame = None
+
+    init_ms = None
+    if pygame is not None:
+        # The mixer was already opened when the app modules were imported
+        if pygame.mixer.get_init():
+            pygame.mixer.quit()
+        start = time.perf_counter()
+        try:
+            pygame.mixer.init()
+            init_ms = elapsed_ms(start)
+        except pygame.error as e:
+            print(f"  ⚠ Could not open the audio device: {e}")
+            pygame = None
+
+    import wave
+    decode_errors = (OSError, EOFError, wave.Error) + ((pygame.error,) if pygame is not None else ())
+    decoded = 0
+    start = time.perf_counter()
+    for path in wav_files:
+        try:
+            if pygame is not None:
+                pygame.mixer.Sound(path)
+            else:
+                # Without a mixer, at least time reading the samples
+                with wave.open(path) as wav:
+                    wav.readframes(wav.getnframes())
+            decoded += 1
+        except decode_errors as e:
+            print(f"  ⚠ Could not decode {os.path.basename(path)}: {e}")
+    decode_ms = elapsed_ms(start) if decoded else None
+    return init_ms, decode_ms
+
+
+def type_answers(root, level, keystrokes):
+    """Type correct answers into a level key by key; returns the latency of each keystroke in ms"""
+    latencies = []
+    while len(latencies) < keystrokes:
+        exercise = level.exercise
+        fields = ["left", "right"] if level.logic.level == 1 else [exercise.unknown]
+        for field in fields:
+            entry = getattr(level, f"{field}_entry")
+            for digit in str(getattr(exercise, field)):
+                entry.insert("end", digit)
+                start = time.perf_counter()
+                level.on_key_release(SimpleNamespace(widget=entry))
+                root.update()
+                latencies.append(elapsed_ms(start))
+
+        # Skip the feedback delay
+        for after_id in list(level.feedback_ids):
+            level.after_cancel(after_id)
+        level.feedback_ids.clear()
+        level.on_correct()
+        root.update()
+    return latencies
+
+
+def run_diagnostics(thresholds, keystrokes):
+    """Measure startup and input latency
+
+    Returns True if everything is within thresholds, or None if no window could be opened.
+    """
+    import tkinter as tk
+
+    results = {}
+
+    print("Creating Tk root...")
+    start = time.perf_counter()
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"✗ Could not create a Tk window: {e}")
+        return None
+    results["tk_root"] = elapsed_ms(start)
+
+    print("Creating fonts...")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from styles import FONT_SPECS, get_font
+    start = time.perf_counter()
+    for name in FONT_SPECS:
+        # Measuring forces the font to actually be loaded
+        get_font(root, name).metrics()
+    results["fonts"] = elapsed_ms(start)
+
+    print("Initializing audio...")
+    results["mixer_init"], results["wav_decode"] = measure_mixer()
+
+    print("Building the first level...")
+    from audio_manager import get_audio_manager
+    from levels.registry import get_level_registry
+
+    root.geometry("900x600")
+    start = time.perf_counter()
+    level = get_level_registry().get(1)(root, 5)
+    level.pack(fill="both", expand=True)
+    results["level_construct"] = elapsed_ms(start)
+    start = time.perf_counter()
+    root.update()
+    results["first_paint"] = elapsed_ms(start)
+
+    latencies = []
+    if keystrokes > 0:
+        print(f"Typing {keystrokes} keystrokes...")
+        # Keep the machine quiet; playback runs in the mixer's thread anyway
+        get_audio_manager().enabled = False
+        latencies = sorted(type_answers(root, level, keystrokes))
+    results["keystroke_p95"] = latencies[int(len(latencies) * 0.95) - 1] if latencies else None
+    root.destroy()
+
+    print()
+    print(f"{'Measurement':<18}{'ms':>10}{'limit':>10}")
+    passed = True
+    for name, value in results.items():
+        limit = thresholds.get(name)
+        # A missing or null threshold means no limit
+        limit_text = "-" if limit is None else limit
+        if value is None:
+            print(f"{name:<18}{'n/a':>10}{limit_text:>10}  - skipped")
+            continue
+        ok = limit is None or value <= limit
+        passed = passed and ok
+        print(f"{name:<18}{value:>10.1f}{limit_text:>10}  {'✓' if ok else '⚠ slow'}")
+    if latencies:
+        print(f"(median keystroke: {latencies[len(latencies) // 2]:.1f} ms)")
+    return passed
+
+
 def main():
     """Run all tests"""
+    parser = argparse.ArgumentParser(description="Verify the Math Learning Tool setup")
+    parser.add_argument("--diagnostics", action="store_true",
+                        help="also measure startup, audio and typing latency against thresholds")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS_FILE,
+                        help="JSON file overriding the thresholds in ms (default: diagnostics.json)")
+    parser.add_argument("--keystrokes", type=int, default=100,
+                        help="keystrokes in the synthetic typing run, 0 skips it (default: 100)")
+    args = parser.parse_args()
+    if args.keystrokes < 0:
+        parser.error("--keystrokes must not be negative")
+
     print("=" * 50)
     print("Math Learning Tool - Setup Verification")
     print("=" * 50)
@@ -132,6 +325,23 @@ def main():
         print("✗ Setup incomplete - fix required items above")
     print("=" * 50)
 
+    if args.diagnostics and results[1]:
+        print()
+        print("Performance diagnostics")
+        print("-" * 50)
+        passed = run_diagnostics(load_thresholds(args.thresholds), args.keystrokes)
+        print()
+        print("=" * 50)
+        if passed is None:
+            print("✗ Diagnostics need a display")
+        elif passed:
+            print("✓ PASS - this machine is fast enough")
+        else:
+            print("⚠ WARN - some measurements exceed the thresholds")
+        print("=" * 50)
+        return 0 if passed else 1
+    return 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Reactive UI state store
+Widgets subscribe to the state fields they display. Only fields whose value
+actually changed are pushed to Tk, batched once per event-loop turn.
+"""
+
+import tkinter as tk
+
+_MISSING = object()
+
+
+class StateStore:
+    """Holds UI state and pushes changes to subscribed widgets"""
+
+    def __init__(self, owner, **initial):
+        # Widget used to schedule the batched flush on the Tk event loop
+        self.owner = owner
+        self._values = dict(initial)
+        self._dirty = {}
+        self._subscribers = {}
+        self._flush_id = None
+
+    def get(self, field, default=None):
+        """Return the current value of a field"""
+        return self._values.get(field, default)
+
+    def set(self, **changes):
+        """Update fields; subscribers are notified on the next idle turn"""
+        for field, value in changes.items():
+            if self._values.get(field, _MISSING) == value:
+                continue
+            self._values[field] = value
+            self._dirty[field] = True
+
+        if self._dirty and self._flush_id is None:
+            self._flush_id = self.owner.after_idle(self.flush)
+
+    def subscribe(self, field, callback):
+        """Call callback(value) whenever field changes (and once right away if set)"""
+        self._subscribers.setdefault(field, []).append(callback)
+        if field in self._values:
+            callback(self._values[field])
+
+    def bind(self, widget, field, render):
+        """Bind widget options to a field
+
+        render(value) returns a dict of widget options. Options that are equal
+        to the last applied ones are not sent to Tk again.
+        """
+        applied = {}
+
+        def push(value):
+            options = render(value)
+            changed = {
+                key: option for key, option in options.items()
+                if applied.get(key, _MISSING) != option
+            }
+            if changed:
+                widget.config(**changed)
+                applied.update(changed)
+
+        self.subscribe(field, push)
+
+    def bind_given(self, field, entries, readonly_state="readonly"):
+        """Bind a pair of entries where one shows the given part and the other takes the answer
+
+        The field holds (unknown, text); entries(unknown) returns the (given,
+        answer) entries. The given entry shows text read-only, the answer
+        entry is cleared and made editable.
+        """
+        def push(value):
+            unknown, text = value
+            given_entry, answer_entry = entries(unknown)
+            answer_entry.config(state="normal")
+            answer_entry.delete(0, tk.END)
+            given_entry.config(state="normal")
+            given_entry.delete(0, tk.END)
+            given_entry.insert(0, str(text))
+            given_entry.config(state=readonly_state)
+
+        self.subscribe(field, push)
+
+    def flush(self):
+        """Push all pending changes to their subscribers"""
+        self._flush_id = None
+        dirty, self._dirty = self._dirty, {}
+        for field in dirty:
+            value = self._values[field]
+            for callback in self._subscribers.get(field, ()):
+                callback(value)
+
+    def cancel(self):
+        """Drop the pending flush (call before the owner widget is destroyed)"""
+        if self._flush_id is not None:
+            try:
+                self.owner.after_cancel(self._flush_id)
+            except tk.TclError:
+                pass
+            self._flush_id = None
+        self._dirty = {}